@@ -4,12 +4,14 @@ from flask import Flask
 from flask_cors import CORS
 from app.core.model_loader import initialize_model
 from app.core.config import Config
+from app.core.json_provider import OrjsonProvider
 import logging
 
 def create_app():
     """Create Flask application"""
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = OrjsonProvider(app)
     CORS(app)
     logging.basicConfig(level=logging.INFO)
     
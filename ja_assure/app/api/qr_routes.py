@@ -2,9 +2,9 @@
 QR code related API routes
 """
 
-import base64
 import logging
 import socket
+import pybase64
 from flask import Blueprint, request, jsonify, render_template
 from app.utils.session_manager import session_manager
 from app.utils.image_processing import validate_image_format
@@ -63,7 +63,7 @@ def handle_mobile_upload(session_id):
         for file in uploaded_files[:4]:  # Limit to 4 images
             if file and file.filename and validate_image_format(file):
                 file_content = file.read()
-                file_b64 = base64.b64encode(file_content).decode()
+                file_b64 = pybase64.b64encode_as_string(file_content)
                 file_type = file.content_type or 'image/jpeg'
                 data_url = f"data:{file_type};base64,{file_b64}"
                 processed_images.append(data_url)
@@ -2,21 +2,85 @@
 Main API routes for image processing and 3D generation
 """
 
-import base64
-import io
 import logging
+from pathlib import Path
+import pybase64
 from flask import Blueprint, request, jsonify, send_file
-from app.utils.image_processing import preprocess_image, image_to_base64, decode_base64_image
-from app.utils.model_generation import generate_3d_model, get_latest_model_file
+from app.utils.image_processing import (
+    preprocess_image_bytes, image_to_base64, decode_base64_image, b64_payload,
+    gpu_decode_available, decode_bytes_tensor, preprocess_tensor, tensor_to_image,
+    gpu_preprocess_available, remove_background_bytes, preprocess_foreground_tensor,
+)
+from app.core.model_loader import get_model, get_device_name
+from app.utils.model_generation import generate_3d_model, get_latest_model_file, save_model_files
+from app.utils.image_cache import store_processed_image, get_processed_image
+from app.core.config import Config
 
 logger = logging.getLogger(__name__)
 api_bp = Blueprint('api', __name__)
 
+MODEL_MIMETYPES = {
+    'obj': 'model/obj',
+    'glb': 'model/gltf-binary',
+}
+
+def process_upload(image_bytes, do_remove_background, foreground_ratio):
+    """
+    Preprocess an uploaded image and cache it for /generate
+    
+    Args:
+        image_bytes: Encoded image file (PNG, JPEG, ...)
+        do_remove_background: Whether to remove background
+        foreground_ratio: Ratio for foreground sizing
+        
+    Returns:
+        Response: JSON with the cache token and a JPEG preview
+    """
+    processed_image = None
+    if not do_remove_background and gpu_decode_available():
+        # Decode and fill on the GPU; the cached tensor feeds TSR directly
+        try:
+            image_tensor = decode_bytes_tensor(image_bytes, get_device_name())
+            processed_image = preprocess_tensor(image_tensor, get_model().cfg.cond_image_size)
+            preview = tensor_to_image(processed_image)
+        except Exception as e:
+            logger.warning(f"GPU decode failed, falling back to PIL: {e}")
+            processed_image = None
+    elif do_remove_background and gpu_preprocess_available():
+        # rembg stays on ONNX Runtime; cropping, fill and resize run on the GPU
+        try:
+            cutout = remove_background_bytes(image_bytes)
+            processed_image = preprocess_foreground_tensor(
+                cutout, foreground_ratio, get_model().cfg.cond_image_size, get_device_name()
+            )
+            preview = tensor_to_image(processed_image)
+        except Exception as e:
+            logger.warning(f"GPU preprocessing failed, falling back to PIL: {e}")
+            processed_image = None
+    
+    if processed_image is None:
+        # Preprocess image
+        processed_image = preprocess_image_bytes(image_bytes, do_remove_background, foreground_ratio)
+        preview = processed_image.copy()
+    
+    # Keep the full-resolution image server-side; the client only gets a token
+    token = store_processed_image(processed_image)
+    
+    # Low-res preview for display
+    preview.thumbnail((Config.PREVIEW_SIZE, Config.PREVIEW_SIZE))
+    processed_image_b64 = image_to_base64(preview, format='JPEG')
+    
+    return jsonify({
+        'success': True,
+        'token': token,
+        'processedImage': processed_image_b64
+    })
+
 @api_bp.route('/upload', methods=['POST'])
 def upload_image():
-    """Handle image upload and preprocessing"""
+    """Handle base64 JSON image upload and preprocessing"""
     try:
-        data = request.json
+        data = request.get_json(cache=False)
         image_data = data.get('image')
         do_remove_background = data.get('removeBackground', True)
         foreground_ratio = data.get('foregroundRatio', 0.85)
@@ -24,44 +88,60 @@ def upload_image():
         if not image_data:
             return jsonify({'error': 'No image data provided'}), 400
         
-        # Preprocess image
-        processed_image = preprocess_image(image_data, do_remove_background, foreground_ratio)
+        return process_upload(b64_payload(image_data), do_remove_background, foreground_ratio)
         
-        # Convert processed image to base64
-        processed_image_b64 = image_to_base64(processed_image)
+    except Exception as e:
+        logger.error(f"Error in upload_image: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/upload_bin', methods=['POST'])
+def upload_image_binary():
+    """Handle raw image upload; options are passed as query parameters"""
+    try:
+        image_bytes = request.get_data(cache=False)
+        do_remove_background = request.args.get('removeBackground', 'true').lower() != 'false'
+        foreground_ratio = request.args.get('foregroundRatio', 0.85, type=float)
         
-        return jsonify({
-            'success': True,
-            'processedImage': processed_image_b64
-        })
+        if not image_bytes:
+            return jsonify({'error': 'No image data provided'}), 400
+        
+        return process_upload(image_bytes, do_remove_background, foreground_ratio)
         
     except Exception as e:
-        logger.error(f"Error in upload_image: {e}")
+        logger.error(f"Error in upload_image_binary: {e}")
         return jsonify({'error': str(e)}), 500
 
 @api_bp.route('/generate', methods=['POST'])
 def generate_model():
     """Generate 3D model from processed image"""
     try:
-        data = request.json
+        data = request.get_json(cache=False)
+        token = data.get('token')
         image_data = data.get('processedImage')
         mc_resolution = data.get('mcResolution', 256)
         
-        if not image_data:
+        if token:
+            image = get_processed_image(token)
+            if image is None:
+                return jsonify({'error': 'Processed image expired, please upload it again'}), 410
+        elif image_data:
+            # Older clients still post the processed image back
+            size = get_model().cfg.cond_image_size
+            image = decode_base64_image(image_data, draft_size=(size, size))
+        else:
             return jsonify({'error': 'No processed image data provided'}), 400
         
-        # Decode the processed image
-        image = decode_base64_image(image_data)
-        
         # Generate 3D model
-        output_files, scene_codes = generate_3d_model(image, mc_resolution)
+        model_bytes, scene_codes = generate_3d_model(image, mc_resolution, in_memory=True)
+        
+        # Encode the exported bytes directly, no disk round-trip
+        model_data = {
+            format_type: pybase64.b64encode_as_string(data)
+            for format_type, data in model_bytes.items()
+        }
         
-        # Read files and encode as base64
-        model_data = {}
-        for format_type, filepath in output_files.items():
-            with open(filepath, 'rb') as f:
-                file_data = base64.b64encode(f.read()).decode()
-                model_data[format_type] = file_data
+        # Persist before responding, so a /download right after this serves this model
+        save_model_files(model_bytes)
         
         return jsonify({
             'success': True,
@@ -82,7 +162,26 @@ def download_model(model_format):
         if not latest_file:
             return jsonify({'error': 'No model file found'}), 404
         
-        return send_file(latest_file, as_attachment=True)
+        latest_file = Path(latest_file)
+        mimetype = MODEL_MIMETYPES.get(model_format, 'application/octet-stream')
+        gz_file = latest_file.with_name(latest_file.name + '.gz')
+        
+        # Serve the pre-compressed copy when the client accepts gzip
+        if 'gzip' in request.accept_encodings and gz_file.exists():
+            response = send_file(
+                gz_file,
+                mimetype=mimetype,
+                as_attachment=True,
+                download_name=latest_file.name,
+                conditional=True,
+            )
+            response.headers['Content-Encoding'] = 'gzip'
+            response.vary.add('Accept-Encoding')
+            return response
+        
+        response = send_file(latest_file, mimetype=mimetype, as_attachment=True, conditional=True)
+        response.vary.add('Accept-Encoding')
+        return response
         
     except Exception as e:
         logger.error(f"Error downloading model: {e}")
@@ -14,17 +14,34 @@ class Config:
     CONFIG_NAME = "config.yaml"
     WEIGHT_NAME = "model.ckpt"
     CHUNK_SIZE = 8192
+    REMBG_MODEL = os.environ.get('REMBG_MODEL', 'u2netp')
+    
+    # Request batching for the TSR forward pass
+    INFERENCE_MAX_BATCH = 4
+    INFERENCE_MAX_WAIT = 0.02  # seconds to wait for more requests
+    INFERENCE_TIMEOUT = 300
+    # Inference precision on CUDA: 'fp32', 'bf16' or 'fp16'
+    PRECISION = os.environ.get('TRIPOSR_PRECISION', 'bf16')
     
     # Processing settings
     MC_RESOLUTION = 256
     FOREGROUND_RATIO = 0.85
+    PREVIEW_SIZE = 512
+    
+    # Preprocessed images kept server-side between /upload and /generate
+    PROCESSED_CACHE_SIZE = 64
+    PROCESSED_CACHE_TTL = 600  # 10 minutes
     
     # File settings
     OUTPUT_DIR = Path("outputs")
+    # Let the front proxy (nginx X-Sendfile/X-Accel) stream downloads from disk
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
     
     # Session settings (for QR code)
     SESSION_TIMEOUT = 3600  # 1 hour
     MAX_IMAGES_PER_SESSION = 4
+    # Set to share sessions across workers, e.g. redis://localhost:6379/0
+    REDIS_URL = os.environ.get('REDIS_URL')
     
     @classmethod
     def init_directories(cls):
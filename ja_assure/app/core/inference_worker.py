@@ -0,0 +1,140 @@
+"""Background worker that batches TSR forward passes across requests"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+import torch
+from app.core.config import Config
+from app.core.model_loader import get_model, get_device_name
+
+logger = logging.getLogger(__name__)
+
+_AUTOCAST_DTYPES = {
+    'bf16': torch.bfloat16,
+    'fp16': torch.float16,
+}
+
+def run_forward(model, images, device):
+    """
+    Run the TSR forward pass, under reduced-precision autocast on CUDA
+    
+    Args:
+        model: TSR model
+        images: List of preprocessed images (PIL Images or HWC tensors)
+        device: Torch device name
+        
+    Returns:
+        torch.Tensor: fp32 scene codes, one per image
+    """
+    autocast_dtype = _AUTOCAST_DTYPES.get(Config.PRECISION)
+    use_autocast = autocast_dtype is not None and str(device).startswith('cuda')
+    with torch.inference_mode(), torch.autocast(
+        device_type='cuda', dtype=autocast_dtype or torch.float32, enabled=use_autocast
+    ):
+        scene_codes = model(images, device=device)
+    # Mesh extraction runs outside autocast and expects fp32 scene codes
+    return scene_codes.float()
+
+class InferenceWorker:
+    """Drain queued images every few milliseconds and run them as one batch"""
+    
+    def __init__(self, max_batch_size=None, max_wait=None):
+        self.max_batch_size = max_batch_size or Config.INFERENCE_MAX_BATCH
+        self.max_wait = Config.INFERENCE_MAX_WAIT if max_wait is None else max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stream = None
+    
+    def submit(self, image):
+        """
+        Queue an image for the next batch
+        
+        Args:
+            image: Preprocessed PIL Image or HWC tensor
+            
+        Returns:
+            concurrent.futures.Future: Resolves to that image's scene codes
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((image, future))
+        return future
+    
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='tsr-inference', daemon=True)
+                self._thread.start()
+    
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            batch = [(image, future) for image, future in batch if future.set_running_or_notify_cancel()]
+            if batch:
+                self._run_batch(batch)
+    
+    def _run_batch(self, batch):
+        model = get_model()
+        device = get_device_name()
+        try:
+            # Resize each input to the conditioning size on the model device so
+            # PIL and tensor inputs can be stacked into one batch
+            size = model.cfg.cond_image_size
+            images = [
+                model.image_processor.convert_and_resize(image, size).to(device)
+                for image, _ in batch
+            ]
+            
+            if str(device).startswith('cuda'):
+                if self._stream is None:
+                    self._stream = torch.cuda.Stream(device=device)
+                # The inputs were written on the current stream; the side stream
+                # must not read them before that work is done
+                self._stream.wait_stream(torch.cuda.current_stream())
+                for image in images:
+                    image.record_stream(self._stream)
+                with torch.cuda.stream(self._stream):
+                    scene_codes = run_forward(model, images, device)
+                self._stream.synchronize()
+            else:
+                scene_codes = run_forward(model, images, device)
+        except Exception as e:
+            logger.error(f"Batched inference failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        if len(batch) > 1:
+            logger.info(f"Ran batched inference on {len(batch)} images")
+        for i, (_, future) in enumerate(batch):
+            future.set_result(scene_codes[i:i + 1])
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def get_inference_worker():
+    """Get the process-wide inference worker"""
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = InferenceWorker()
+    return _worker
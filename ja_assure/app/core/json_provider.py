@@ -0,0 +1,22 @@
+"""orjson-backed JSON provider"""
+
+import orjson
+from flask.json.provider import JSONProvider
+
+class OrjsonProvider(JSONProvider):
+    """Serialize API responses with orjson instead of the stdlib json module"""
+    
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self.option), mimetype='application/json'
+        )
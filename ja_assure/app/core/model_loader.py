@@ -1,8 +1,10 @@
 """Model initialization"""
 
+import os
 import logging
 import torch
 import rembg
+import onnxruntime as ort
 from tsr.system import TSR
 from app.core.config import Config
 
@@ -13,6 +15,34 @@ model = None
 rembg_session = None
 device = None
 
+def get_rembg_providers(device):
+    """ONNX Runtime providers for rembg: the TSR GPU first when there is one, then CPU"""
+    if device.startswith("cuda"):
+        device_id = int(device.split(":")[1]) if ":" in device else 0
+        return [("CUDAExecutionProvider", {"device_id": device_id}), "CPUExecutionProvider"]
+    return ["CPUExecutionProvider"]
+
+def create_rembg_session(model_name, providers):
+    """
+    Create a rembg session with ONNX Runtime memory planning and arena enabled
+    
+    rembg.new_session builds its own SessionOptions, so the session class is
+    looked up and constructed the same way it does, with our options instead.
+    """
+    sess_opts = ort.SessionOptions()
+    sess_opts.enable_mem_pattern = True
+    sess_opts.enable_cpu_mem_arena = True
+    sess_opts.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+    
+    try:
+        from rembg.sessions import sessions_class
+        session_class = next(sc for sc in sessions_class if sc.name() == model_name)
+    except (ImportError, StopIteration):
+        logger.warning("Could not pass ONNX Runtime options to rembg, using defaults")
+        return rembg.new_session(model_name=model_name, providers=providers)
+    
+    return session_class(model_name, sess_opts, providers)
+
 def initialize_model():
     """Initialize TripoSR model"""
     global model, rembg_session, device
@@ -31,7 +61,7 @@ def initialize_model():
         model.to(device)
         logger.info("Model loaded successfully")
         
-        rembg_session = rembg.new_session()
+        rembg_session = create_rembg_session(Config.REMBG_MODEL, get_rembg_providers(device))
         Config.init_directories()
         
     except Exception as e:
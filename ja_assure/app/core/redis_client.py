@@ -0,0 +1,28 @@
+"""Redis connection management"""
+
+import logging
+import threading
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+_redis = None
+_redis_lock = threading.Lock()
+
+def get_redis():
+    """
+    Get the shared Redis client, creating its connection pool on first use
+    
+    Returns:
+        redis.Redis: Client bound to Config.REDIS_URL
+    """
+    global _redis
+    
+    if _redis is None:
+        with _redis_lock:
+            if _redis is None:
+                import redis
+                pool = redis.ConnectionPool.from_url(Config.REDIS_URL)
+                _redis = redis.Redis(connection_pool=pool)
+                logger.info("Connected session store to Redis")
+    return _redis
@@ -2,7 +2,9 @@
 
 // Global variables
 let currentImages = [null, null, null, null];
+let currentFiles = [null, null, null, null];
 let processedImage = null;
+let processedImageToken = null;
 let generatedModels = null;
 let currentQRSession = null;
 let qrCheckInterval = null;
@@ -120,6 +122,7 @@ function handleImageUpload(file, slotIndex) {
     const reader = new FileReader();
     reader.onload = function(e) {
         currentImages[slotIndex] = e.target.result;
+        currentFiles[slotIndex] = file;
         
         const slot = imageSlots[slotIndex];
         const preview = slot.querySelector('.preview-image');
@@ -141,22 +144,39 @@ async function processImage() {
     if (!currentImages[0]) return;
 
     try {
-        const response = await fetch('/api/upload', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                image: currentImages[0],
+        let response;
+        if (currentFiles[0]) {
+            // Send the file as-is, no base64 or JSON wrapping
+            const params = new URLSearchParams({
                 removeBackground: removeBgCheckbox.checked,
                 foregroundRatio: parseFloat(foregroundRatioSlider.value)
-            })
-        });
+            });
+            response = await fetch(`/api/upload_bin?${params}`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/octet-stream',
+                },
+                body: currentFiles[0]
+            });
+        } else {
+            response = await fetch('/api/upload', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    image: currentImages[0],
+                    removeBackground: removeBgCheckbox.checked,
+                    foregroundRatio: parseFloat(foregroundRatioSlider.value)
+                })
+            });
+        }
 
         const result = await response.json();
         
         if (result.success) {
             processedImage = result.processedImage;
+            processedImageToken = result.token;
             processedImageEl.src = processedImage;
             processedPreview.classList.remove('hidden');
             generateBtn.disabled = false;
@@ -190,7 +210,7 @@ async function generateModel() {
                 'Content-Type': 'application/json',
             },
             body: JSON.stringify({
-                processedImage: processedImage,
+                token: processedImageToken,
                 mcResolution: parseInt(mcResolutionSlider.value)
             })
         });
@@ -423,6 +443,7 @@ function startQRSessionCheck() {
                     // Load the first image
                     if (result.images[0]) {
                         currentImages[0] = result.images[0];
+                        currentFiles[0] = null;
                         const slot = imageSlots[0];
                         const preview = slot.querySelector('.preview-image');
                         const content = slot.querySelector('.upload-content');
@@ -0,0 +1,36 @@
+"""
+Optional Numba kernels for per-pixel image loops
+
+blend_rgba_gray is None when Numba is not installed; callers fall back to NumPy.
+"""
+
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+blend_rgba_gray = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def blend_rgba_gray(arr, out):
+        """Composite an HxWx4 uint8 image over mid-gray into an HxWx3 uint8 buffer"""
+        height, width = arr.shape[0], arr.shape[1]
+        for y in prange(height):
+            for x in range(width):
+                a = np.int32(arr[y, x, 3])
+                inv = 255 - a
+                for c in range(3):
+                    out[y, x, c] = (np.int32(arr[y, x, c]) * a + inv * 128) // 255
+
+    # Compile (or load from cache) now rather than on the first request
+    try:
+        blend_rgba_gray(np.zeros((1, 1, 4), dtype=np.uint8), np.empty((1, 1, 3), dtype=np.uint8))
+    except Exception as e:
+        logger.warning(f"Numba blend kernel unavailable, using NumPy: {e}")
+        blend_rgba_gray = None
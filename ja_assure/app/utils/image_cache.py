@@ -0,0 +1,43 @@
+"""
+Server-side cache of preprocessed images between /upload and /generate
+"""
+
+import uuid
+import threading
+from cachetools import TTLCache
+from app.core.config import Config
+
+_processed_images = TTLCache(
+    maxsize=Config.PROCESSED_CACHE_SIZE,
+    ttl=Config.PROCESSED_CACHE_TTL,
+)
+# TTLCache is not thread-safe on its own
+_cache_lock = threading.Lock()
+
+def store_processed_image(image):
+    """
+    Cache a preprocessed image under a fresh token
+    
+    Args:
+        image: Preprocessed PIL Image
+        
+    Returns:
+        str: Token the client passes back to /generate
+    """
+    token = uuid.uuid4().hex
+    with _cache_lock:
+        _processed_images[token] = image
+    return token
+
+def get_processed_image(token):
+    """
+    Look up a cached preprocessed image
+    
+    Args:
+        token: Token returned by store_processed_image
+        
+    Returns:
+        PIL.Image: Cached image or None if unknown/expired
+    """
+    with _cache_lock:
+        return _processed_images.get(token)
@@ -2,17 +2,114 @@
 Image processing utilities
 """
 
-import base64
 import io
 import numpy as np
+import pybase64
 from PIL import Image
 import torch
 import logging
-from app.core.model_loader import get_rembg_session
+import torch.nn.functional as F
+from app.core.model_loader import get_rembg_session, get_device_name
+from app.utils._kernels import blend_rgba_gray
 from tsr.utils import remove_background, resize_foreground
 
+try:
+    from torchvision.io import ImageReadMode, decode_image, decode_jpeg
+except ImportError:
+    decode_image = None
+
 logger = logging.getLogger(__name__)
 
+JPEG_MAGIC = b'\xff\xd8'
+
+_RAW_MODES = ('L', 'RGB', 'RGBA')
+
+def b64_payload(image_data):
+    """
+    Decode base64 image data, with or without a data: URL prefix
+    
+    The prefix is located with a bounded find and skipped through a memoryview,
+    so the payload is never copied before decoding.
+    
+    Args:
+        image_data: Base64 encoded image data (str or bytes)
+        
+    Returns:
+        bytes: Raw image file bytes
+    """
+    buf = image_data.encode('ascii') if isinstance(image_data, str) else image_data
+    comma = buf.find(b',', 0, 64)
+    payload = memoryview(buf)[comma + 1:] if comma >= 0 else buf
+    return pybase64.b64decode(payload, validate=False)
+
+def image_array(image):
+    """
+    Copy a PIL image into a NumPy array with a single encode pass
+    
+    np.asarray goes through Image.tobytes(), which encodes in 64 KiB slices and
+    then joins them, an extra full copy for multi-megapixel uploads. Raw 8-bit
+    modes are encoded into one buffer sized to the image instead.
+    
+    Args:
+        image: PIL Image
+        
+    Returns:
+        np.ndarray: Read-only uint8 array, HxW or HxWxC
+    """
+    if image.mode not in _RAW_MODES or not image.width or not image.height:
+        return np.asarray(image)
+    
+    image.load()
+    encoder = Image._getencoder(image.mode, "raw", image.mode)
+    encoder.setimage(image.im, (0, 0) + image.size)
+    _, errcode, data = encoder.encode(image.width * image.height * len(image.mode))
+    if errcode <= 0:
+        # Not finished in one pass after all; let Pillow do it
+        return np.asarray(image)
+    
+    shape = (image.height, image.width) + ((len(image.mode),) if len(image.mode) > 1 else ())
+    return np.frombuffer(data, dtype=np.uint8).reshape(shape)
+
+def fill_background(img):
+    """
+    Fill transparent background with gray
+    
+    Blends in integer space so the whole image never gets promoted to float32.
+    
+    Args:
+        img: RGBA PIL Image
+        
+    Returns:
+        PIL.Image: RGB image composited over mid-gray
+    """
+    arr = image_array(img)
+    if blend_rgba_gray is not None:
+        out = np.empty(arr.shape[:2] + (3,), dtype=np.uint8)
+        blend_rgba_gray(np.ascontiguousarray(arr), out)
+        return Image.fromarray(out, 'RGB')
+    
+    rgb = arr[..., :3].astype(np.uint16)
+    alpha = arr[..., 3:4].astype(np.uint16)
+    inv_alpha = np.subtract(255, alpha, dtype=np.uint16)
+    out = (rgb * alpha + inv_alpha * 128) // 255
+    return Image.fromarray(out.astype(np.uint8), 'RGB')
+
+def normalize_mode(image):
+    """
+    Bring a decoded image to RGB or RGBA, converting only when needed
+    
+    Args:
+        image: PIL Image in any mode
+        
+    Returns:
+        PIL.Image: The same image if already RGB/RGBA, else a converted copy
+    """
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    if image.mode in ("LA", "PA") or "transparency" in image.info:
+        return image.convert("RGBA")
+    return image.convert("RGB")
+
 def preprocess_image(image_data, do_remove_background=True, foreground_ratio=0.85):
     """
     Preprocess the input image
@@ -25,37 +122,164 @@ def preprocess_image(image_data, do_remove_background=True, foreground_ratio=0.8
     Returns:
         PIL.Image: Preprocessed image
     """
-    try:
-        # Decode base64 image
-        if isinstance(image_data, str) and image_data.startswith('data:image'):
-            image_data = image_data.split(',')[1]
-        
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGBA")
+    return preprocess_image_bytes(b64_payload(image_data), do_remove_background, foreground_ratio)
+
+def remove_background_bytes(image_bytes):
+    """
+    Decode raw image file bytes and run background removal
+    
+    Args:
+        image_bytes: Encoded image file (PNG, JPEG, ...)
         
-        def fill_background(img):
-            """Fill transparent background with gray"""
-            img_array = np.array(img).astype(np.float32) / 255.0
-            img_array = img_array[:, :, :3] * img_array[:, :, 3:4] + (1 - img_array[:, :, 3:4]) * 0.5
-            return Image.fromarray((img_array * 255.0).astype(np.uint8))
+    Returns:
+        PIL.Image: RGBA image with the background removed
+    """
+    image = normalize_mode(Image.open(io.BytesIO(image_bytes)))
+    return remove_background(image, get_rembg_session())
 
+def preprocess_image_bytes(image_bytes, do_remove_background=True, foreground_ratio=0.85):
+    """
+    Preprocess raw image file bytes
+    
+    Args:
+        image_bytes: Encoded image file (PNG, JPEG, ...)
+        do_remove_background: Whether to remove background
+        foreground_ratio: Ratio for foreground sizing
+        
+    Returns:
+        PIL.Image: Preprocessed image
+    """
+    try:
         if do_remove_background:
-            image_rgb = image.convert("RGB")
-            rembg_session = get_rembg_session()
-            image = remove_background(image_rgb, rembg_session)
+            # rembg takes RGB or RGBA as-is, and keeps an existing cutout
+            image = remove_background_bytes(image_bytes)
             image = resize_foreground(image, foreground_ratio)
             image = fill_background(image)
         else:
+            image = normalize_mode(Image.open(io.BytesIO(image_bytes)))
             if image.mode == "RGBA":
                 image = fill_background(image)
-            else:
-                image = image.convert("RGB")
         
         return image
     except Exception as e:
         logger.error(f"Error preprocessing image: {e}")
         raise
 
+def gpu_preprocess_available():
+    """Whether tensor preprocessing can run on a CUDA device"""
+    return str(get_device_name()).startswith('cuda')
+
+def gpu_decode_available():
+    """Whether uploads can be decoded straight onto the GPU with torchvision"""
+    return decode_image is not None and gpu_preprocess_available()
+
+def decode_image_tensor(image_data, device):
+    """
+    Decode base64 image data into a CHW uint8 tensor on device
+    
+    JPEGs go through nvJPEG so decode and upload happen in one step; other
+    formats are decoded on CPU with an alpha channel and then moved.
+    
+    Args:
+        image_data: Base64 encoded image data
+        device: Target torch device
+        
+    Returns:
+        torch.Tensor: CHW uint8 tensor (3 channels for JPEG, 4 otherwise)
+    """
+    return decode_bytes_tensor(b64_payload(image_data), device)
+
+def decode_bytes_tensor(image_bytes, device):
+    """
+    Decode raw image file bytes into a CHW uint8 tensor on device
+    
+    Args:
+        image_bytes: Encoded image file (PNG, JPEG, ...)
+        device: Target torch device
+        
+    Returns:
+        torch.Tensor: CHW uint8 tensor (3 channels for JPEG, 4 otherwise)
+    """
+    raw = bytearray(image_bytes)
+    buf = torch.frombuffer(raw, dtype=torch.uint8)
+    if raw[:2] == JPEG_MAGIC:
+        return decode_jpeg(buf, mode=ImageReadMode.RGB, device=device)
+    return decode_image(buf, mode=ImageReadMode.RGB_ALPHA).to(device)
+
+def preprocess_tensor(img_t, size):
+    """
+    Tensor counterpart of the no-background-removal preprocess path
+    
+    Args:
+        img_t: CHW uint8 tensor, RGB or RGBA
+        size: Model conditioning image size
+        
+    Returns:
+        torch.Tensor: HWC float32 image in [0, 1], size x size, on img_t's device
+    """
+    if img_t.shape[0] == 4:
+        # Same integer gray fill as fill_background
+        rgb = img_t[:3].to(torch.int32)
+        alpha = img_t[3:].to(torch.int32)
+        img_t = (rgb * alpha + (255 - alpha) * 128) // 255
+    
+    img_t = img_t.float().div_(255.0)[None]
+    # Identical resize to TSR's ImagePreprocessor, so it becomes a no-op there
+    img_t = F.interpolate(img_t, (size, size), mode="bilinear", align_corners=False, antialias=True)
+    return img_t[0].permute(1, 2, 0).contiguous()
+
+def preprocess_foreground_tensor(image, foreground_ratio, size, device):
+    """
+    GPU counterpart of resize_foreground + fill_background for rembg output
+    
+    The RGBA image is uploaded once through pinned memory; cropping, padding,
+    the gray fill and the resize to the model size all happen on device.
+    
+    Args:
+        image: RGBA PIL Image with the background removed
+        foreground_ratio: Ratio for foreground sizing
+        size: Model conditioning image size
+        device: Target torch device
+        
+    Returns:
+        torch.Tensor: HWC float32 image in [0, 1], size x size, on device
+    """
+    arr = image_array(image)
+    host = torch.empty(arr.shape, dtype=torch.uint8, pin_memory=True)
+    host.numpy()[...] = arr
+    img_t = host.to(device, non_blocking=True).permute(2, 0, 1)
+    
+    # Foreground bounding box, same (exclusive max) crop as resize_foreground
+    mask = img_t[3] > 0
+    rows = torch.nonzero(mask.any(dim=1)).squeeze(1)
+    cols = torch.nonzero(mask.any(dim=0)).squeeze(1)
+    y1, y2 = rows[0].item(), rows[-1].item()
+    x1, x2 = cols[0].item(), cols[-1].item()
+    fg = img_t[:, y1:y2, x1:x2]
+    
+    # Square pad and ratio pad folded into a single transparent pad
+    h, w = fg.shape[1:]
+    square = max(h, w)
+    new_size = int(square / foreground_ratio)
+    top = (square - h) // 2 + (new_size - square) // 2
+    left = (square - w) // 2 + (new_size - square) // 2
+    fg = F.pad(fg, (left, new_size - w - left, top, new_size - h - top), value=0)
+    
+    return preprocess_tensor(fg, size)
+
+def tensor_to_image(img_t):
+    """
+    Convert an HWC float tensor in [0, 1] to a PIL Image
+    
+    Args:
+        img_t: HWC float tensor
+        
+    Returns:
+        PIL.Image: RGB image
+    """
+    arr = img_t.mul(255.0).round_().clamp_(0, 255).to(torch.uint8).cpu().numpy()
+    return Image.fromarray(arr, 'RGB')
+
 def image_to_base64(image, format='PNG'):
     """
     Convert PIL Image to base64 string
@@ -68,25 +292,30 @@ def image_to_base64(image, format='PNG'):
         str: Base64 encoded image
     """
     buffer = io.BytesIO()
-    image.save(buffer, format=format)
-    image_b64 = base64.b64encode(buffer.getvalue()).decode()
+    if format.upper() == 'JPEG':
+        # Fast libjpeg path for previews; PNG stays available for lossless/alpha flows
+        image.save(buffer, format=format, quality=90, optimize=False, subsampling=2)
+    else:
+        image.save(buffer, format=format)
+    image_b64 = pybase64.b64encode_as_string(buffer.getvalue())
     return f"data:image/{format.lower()};base64,{image_b64}"
 
-def decode_base64_image(image_data):
+def decode_base64_image(image_data, draft_size=None):
     """
     Decode base64 image data to PIL Image
     
     Args:
         image_data: Base64 encoded image string
+        draft_size: Optional (width, height) the image will be used at; lets
+            libjpeg downscale by a power of two while decoding
         
     Returns:
         PIL.Image: Decoded image
     """
-    if image_data.startswith('data:image'):
-        image_data = image_data.split(',')[1]
-    
-    image_bytes = base64.b64decode(image_data)
-    return Image.open(io.BytesIO(image_bytes))
+    image = Image.open(io.BytesIO(b64_payload(image_data)))
+    if draft_size is not None:
+        image.draft('RGB', draft_size)
+    return image
 
 def validate_image_format(file):
     """
@@ -2,17 +2,73 @@
 3D model generation utilities
 """
 
+import io
+import os
+import gzip
 import time
 import logging
-import torch
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from app.core.model_loader import get_model, get_device_name
+from trimesh.exchange.gltf import export_glb
+from app.core.model_loader import get_model
+from app.core.inference_worker import get_inference_worker
 from app.core.config import Config
 from tsr.utils import to_gradio_3d_orientation
 
 logger = logging.getLogger(__name__)
 
-def generate_3d_model(image, mc_resolution=None, formats=None):
+# Exported files per format, oldest first; replaces output dir scans + stat calls
+_exports = {}
+_exports_lock = threading.Lock()
+
+# One worker per export format so OBJ and GLB encode concurrently
+_export_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='mesh-export')
+
+def _exports_for(format_type):
+    """Export list for a format, seeded from one disk scan on first use; hold _exports_lock"""
+    if format_type not in _exports:
+        files = list(Config.OUTPUT_DIR.glob(f"model_*.{format_type}"))
+        files.sort(key=os.path.getctime)
+        _exports[format_type] = deque(files)
+    return _exports[format_type]
+
+def _record_export(format_type, filepath):
+    filepath = Path(filepath)
+    with _exports_lock:
+        files = _exports_for(format_type)
+        # A fresh scan may already have picked up the file just written
+        if filepath not in files:
+            files.append(filepath)
+
+def _model_id():
+    """Unique model file stem; the suffix keeps generations in the same second apart"""
+    return f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
+
+def export_mesh_bytes(mesh, format_type):
+    """
+    Export a mesh to bytes in the given format
+    
+    GLB goes straight to trimesh's glTF exporter without vertex normals; the
+    viewer recomputes them and skipping them saves both encode time and payload.
+    
+    Args:
+        mesh: trimesh.Trimesh to export
+        format_type: File format ('obj', 'glb')
+        
+    Returns:
+        bytes: Exported model
+    """
+    if format_type == 'glb':
+        return export_glb(mesh, include_normals=False)
+    
+    buffer = io.BytesIO()
+    mesh.export(file_obj=buffer, file_type=format_type)
+    return buffer.getvalue()
+
+def generate_3d_model(image, mc_resolution=None, formats=None, in_memory=False):
     """
     Generate 3D model from preprocessed image
     
@@ -20,9 +76,11 @@ def generate_3d_model(image, mc_resolution=None, formats=None):
         image: Preprocessed PIL Image
         mc_resolution: Marching cubes resolution
         formats: List of output formats ['obj', 'glb']
+        in_memory: Export to bytes instead of writing files to disk
         
     Returns:
-        tuple: (output_files dict, scene_codes)
+        tuple: (output_files dict, scene_codes); with in_memory the dict
+        maps each format to the exported bytes instead of a file path
     """
     if mc_resolution is None:
         mc_resolution = Config.MC_RESOLUTION
@@ -34,24 +92,36 @@ def generate_3d_model(image, mc_resolution=None, formats=None):
         logger.info("Generating 3D model...")
         
         model = get_model()
-        device = get_device_name()
         
-        # Generate scene codes
-        with torch.no_grad():
-            scene_codes = model([image], device=device)
+        # Generate scene codes; the worker batches concurrent requests
+        scene_codes = get_inference_worker().submit(image).result(timeout=Config.INFERENCE_TIMEOUT)
         
         # Extract mesh
         mesh = model.extract_mesh(scene_codes, True, resolution=mc_resolution)[0]
         mesh = to_gradio_3d_orientation(mesh)
         
+        if in_memory:
+            # One mesh copy per export; trimesh's lazy cache is not thread-safe
+            futures = {
+                format_type: _export_pool.submit(export_mesh_bytes, mesh.copy(), format_type)
+                for format_type in formats
+            }
+            model_bytes = {format_type: future.result() for format_type, future in futures.items()}
+            
+            logger.info("3D model generated successfully")
+            return model_bytes, scene_codes
+        
         # Save in requested formats
         output_files = {}
-        timestamp = str(int(time.time()))
+        model_id = _model_id()
         
         for format_type in formats:
-            filename = f"model_{timestamp}.{format_type}"
+            filename = f"model_{model_id}.{format_type}"
             filepath = Config.OUTPUT_DIR / filename
-            mesh.export(str(filepath))
+            data = export_mesh_bytes(mesh, format_type)
+            filepath.write_bytes(data)
+            write_gzip_copy(filepath, data)
+            _record_export(format_type, filepath)
             output_files[format_type] = str(filepath)
         
         logger.info("3D model generated successfully")
@@ -61,6 +131,51 @@ def generate_3d_model(image, mc_resolution=None, formats=None):
         logger.error(f"Error generating 3D model: {e}")
         raise
 
+def write_gzip_copy(filepath, data=None):
+    """
+    Write a pre-compressed <file>.gz next to an exported model for /download
+    
+    Args:
+        filepath: Path of the exported model file
+        data: Model bytes, read from filepath when not given
+    """
+    filepath = Path(filepath)
+    gz_path = filepath.with_name(filepath.name + '.gz')
+    tmp_path = gz_path.with_name(gz_path.name + '.tmp')
+    try:
+        if data is None:
+            data = filepath.read_bytes()
+        # Level 1 keeps this cheap; OBJ is ASCII and still shrinks several-fold
+        tmp_path.write_bytes(gzip.compress(data, compresslevel=1))
+        os.replace(tmp_path, gz_path)
+    except Exception as e:
+        logger.warning(f"Failed to write {gz_path}: {e}")
+
+def save_model_files(model_bytes):
+    """
+    Write exported model bytes to the output directory
+    
+    Args:
+        model_bytes: Dict mapping format to exported bytes
+        
+    Returns:
+        dict: Mapping of format to written file path
+    """
+    output_files = {}
+    model_id = _model_id()
+    
+    for format_type, data in model_bytes.items():
+        filepath = Config.OUTPUT_DIR / f"model_{model_id}.{format_type}"
+        try:
+            filepath.write_bytes(data)
+            write_gzip_copy(filepath, data)
+            _record_export(format_type, filepath)
+            output_files[format_type] = str(filepath)
+        except Exception as e:
+            logger.error(f"Failed to save {filepath}: {e}")
+    
+    return output_files
+
 def get_latest_model_file(format_type):
     """
     Get the most recently generated model file of specified format
@@ -72,14 +187,9 @@ def get_latest_model_file(format_type):
         Path: Path to latest model file or None
     """
     try:
-        files = list(Config.OUTPUT_DIR.glob(f"model_*.{format_type}"))
-        if not files:
-            return None
-        
-        # Return the most recent file
-        import os
-        latest_file = max(files, key=os.path.getctime)
-        return latest_file
+        with _exports_lock:
+            files = _exports_for(format_type)
+            return files[-1] if files else None
         
     except Exception as e:
         logger.error(f"Error finding latest model file: {e}")
@@ -93,21 +203,19 @@ def cleanup_old_models(max_files=10):
         max_files: Maximum number of files to keep per format
     """
     try:
-        import os
-        
         for format_type in ['obj', 'glb']:
-            files = list(Config.OUTPUT_DIR.glob(f"model_*.{format_type}"))
-            if len(files) > max_files:
-                # Sort by creation time and remove oldest
-                files.sort(key=os.path.getctime)
-                files_to_remove = files[:-max_files]
-                
-                for file_path in files_to_remove:
-                    try:
-                        file_path.unlink()
-                        logger.info(f"Removed old model file: {file_path}")
-                    except Exception as e:
-                        logger.warning(f"Failed to remove {file_path}: {e}")
-                        
+            with _exports_lock:
+                files = _exports_for(format_type)
+                # Oldest first, so the front of the deque is what goes
+                files_to_remove = [files.popleft() for _ in range(len(files) - max_files)]
+            
+            for file_path in files_to_remove:
+                try:
+                    file_path.unlink()
+                    file_path.with_name(file_path.name + '.gz').unlink(missing_ok=True)
+                    logger.info(f"Removed old model file: {file_path}")
+                except Exception as e:
+                    logger.warning(f"Failed to remove {file_path}: {e}")
+                    
     except Exception as e:
         logger.error(f"Error during cleanup: {e}")
@@ -5,6 +5,9 @@ Session management utilities for QR code uploads
 import time
 import uuid
 import logging
+import threading
+from collections import OrderedDict
+import orjson
 from app.core.config import Config
 
 logger = logging.getLogger(__name__)
@@ -13,7 +16,23 @@ class SessionManager:
     """Manage upload sessions for QR code functionality"""
     
     def __init__(self):
-        self.sessions = {}
+        # Insertion order == creation order, so the oldest session is always first
+        self.sessions = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _is_expired(self, session, now):
+        return now - session['created_at'] > Config.SESSION_TIMEOUT
+    
+    def _expire_oldest(self, now):
+        """Pop expired sessions from the front, stopping at the first live one; hold _lock"""
+        expired_count = 0
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if not self._is_expired(session, now):
+                break
+            self.sessions.popitem(last=False)
+            expired_count += 1
+        return expired_count
     
     def create_session(self):
         """
@@ -23,11 +42,116 @@ class SessionManager:
             str: Session ID
         """
         session_id = str(uuid.uuid4())
-        self.sessions[session_id] = {
+        now = time.monotonic()
+        with self._lock:
+            # Sessions that are never read again would otherwise stay forever;
+            # this only walks the expired ones at the front
+            expired_count = self._expire_oldest(now)
+            self.sessions[session_id] = {
+                'images': [],
+                'created_at': now,
+                'status': 'waiting'
+            }
+        
+        if expired_count:
+            logger.info(f"Cleaned up {expired_count} expired sessions")
+        logger.info(f"Created new session: {session_id}")
+        return session_id
+    
+    def get_session(self, session_id):
+        """
+        Get session data by ID
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            dict: Session data or None if not found/expired
+        """
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            
+            # Check if session has expired
+            if self._is_expired(session, time.monotonic()):
+                del self.sessions[session_id]
+                logger.info(f"Deleted session: {session_id}")
+                return None
+            
+            return session
+    
+    def update_session(self, session_id, images):
+        """
+        Update session with uploaded images
+        
+        Args:
+            session_id: Session identifier
+            images: List of image data
+            
+        Returns:
+            bool: True if updated successfully
+        """
+        with self._lock:
+            session = self.sessions.get(session_id)
+            now = time.monotonic()
+            if session is None or self._is_expired(session, now):
+                self.sessions.pop(session_id, None)
+                return False
+            
+            session['images'] = images[:Config.MAX_IMAGES_PER_SESSION]
+            session['status'] = 'completed'
+            session['updated_at'] = now
+        
+        logger.info(f"Updated session {session_id} with {len(images)} images")
+        return True
+    
+    def delete_session(self, session_id):
+        """
+        Delete a session
+        
+        Args:
+            session_id: Session identifier
+        """
+        with self._lock:
+            removed = self.sessions.pop(session_id, None)
+        if removed is not None:
+            logger.info(f"Deleted session: {session_id}")
+    
+    def cleanup_expired_sessions(self):
+        """Remove expired sessions, oldest first, stopping at the first live one"""
+        with self._lock:
+            expired_count = self._expire_oldest(time.monotonic())
+        
+        if expired_count:
+            logger.info(f"Cleaned up {expired_count} expired sessions")
+
+class RedisSessionManager:
+    """Upload sessions stored in Redis, shared by every worker process"""
+    
+    KEY_PREFIX = 'sess:'
+    
+    def __init__(self, client=None):
+        from app.core.redis_client import get_redis
+        self.redis = client or get_redis()
+    
+    def _key(self, session_id):
+        return f"{self.KEY_PREFIX}{session_id}"
+    
+    def create_session(self):
+        """
+        Create a new upload session, expiring after Config.SESSION_TIMEOUT
+        
+        Returns:
+            str: Session ID
+        """
+        session_id = str(uuid.uuid4())
+        session = {
             'images': [],
             'created_at': time.time(),
             'status': 'waiting'
         }
+        self.redis.setex(self._key(session_id), Config.SESSION_TIMEOUT, orjson.dumps(session))
         
         logger.info(f"Created new session: {session_id}")
         return session_id
@@ -42,17 +166,10 @@ class SessionManager:
         Returns:
             dict: Session data or None if not found/expired
         """
-        if session_id not in self.sessions:
-            return None
-        
-        session = self.sessions[session_id]
-        
-        # Check if session has expired
-        if time.time() - session['created_at'] > Config.SESSION_TIMEOUT:
-            self.delete_session(session_id)
+        raw = self.redis.get(self._key(session_id))
+        if raw is None:
             return None
-        
-        return session
+        return orjson.loads(raw)
     
     def update_session(self, session_id, images):
         """
@@ -73,6 +190,11 @@ class SessionManager:
         session['status'] = 'completed'
         session['updated_at'] = time.time()
         
+        # XX + KEEPTTL: only overwrite a session that still exists, keeping its expiry
+        updated = self.redis.set(self._key(session_id), orjson.dumps(session), xx=True, keepttl=True)
+        if not updated:
+            return False
+        
         logger.info(f"Updated session {session_id} with {len(images)} images")
         return True
     
@@ -83,24 +205,11 @@ class SessionManager:
         Args:
             session_id: Session identifier
         """
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        if self.redis.delete(self._key(session_id)):
             logger.info(f"Deleted session: {session_id}")
     
     def cleanup_expired_sessions(self):
-        """Remove expired sessions"""
-        current_time = time.time()
-        expired_sessions = []
-        
-        for session_id, session in self.sessions.items():
-            if current_time - session['created_at'] > Config.SESSION_TIMEOUT:
-                expired_sessions.append(session_id)
-        
-        for session_id in expired_sessions:
-            self.delete_session(session_id)
-        
-        if expired_sessions:
-            logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
+        """No-op: Redis expires sessions itself"""
 
 # Global session manager instance
-session_manager = SessionManager()
+session_manager = RedisSessionManager() if Config.REDIS_URL else SessionManager()
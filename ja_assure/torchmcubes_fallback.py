@@ -1,26 +1,56 @@
 """
-Fallback implementation for torchmcubes using PyMCubes
+Fallback implementation for torchmcubes using scikit-image or PyMCubes
 """
 import torch
 import numpy as np
-import mcubes
+
+try:
+    from skimage.measure import marching_cubes as _skimage_marching_cubes
+except ImportError:
+    _skimage_marching_cubes = None
+
+try:
+    import mcubes
+except ImportError:
+    mcubes = None
+
+if _skimage_marching_cubes is None and mcubes is None:
+    raise ImportError("No marching cubes backend available, install torchmcubes, scikit-image or PyMCubes")
+
+def _extract(volume_np, isolevel):
+    """Run the best available CPU marching cubes backend"""
+    if _skimage_marching_cubes is not None:
+        try:
+            # The field is density minus threshold, positive inside the surface, so
+            # 'ascent' is what keeps the faces wound outward
+            vertices, faces, _, _ = _skimage_marching_cubes(
+                volume_np, level=isolevel, gradient_direction='ascent', allow_degenerate=False
+            )
+            return vertices, faces
+        except (RuntimeError, ValueError) as e:
+            if mcubes is None:
+                raise
+            print(f"scikit-image marching cubes failed, trying PyMCubes: {e}")
+    return mcubes.marching_cubes(volume_np, isolevel)
 
 def marching_cubes(volume, isolevel=0.0):
     """
-    Fallback implementation of marching cubes using PyMCubes
+    Fallback implementation of marching cubes on CPU
+    
+    Prefers scikit-image's Lewiner implementation and falls back to PyMCubes.
     """
-    # Convert torch tensor to numpy if needed
+    # Convert torch tensor to numpy if needed; no copy when already float32
     if isinstance(volume, torch.Tensor):
-        volume_np = volume.detach().cpu().numpy().astype(np.float32)
+        volume_np = np.ascontiguousarray(volume.detach().cpu().numpy(), dtype=np.float32)
     else:
-        volume_np = np.array(volume, dtype=np.float32)
+        volume_np = np.ascontiguousarray(volume, dtype=np.float32)
     
     # Ensure isolevel is float
     isolevel = float(isolevel)
     
-    # Use PyMCubes to extract mesh
+    # Extract mesh
     try:
-        vertices, faces = mcubes.marching_cubes(volume_np, isolevel)
+        vertices, faces = _extract(volume_np, isolevel)
         
         # Convert back to torch tensors with proper device handling
         if isinstance(volume, torch.Tensor):
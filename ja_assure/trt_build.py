@@ -0,0 +1,162 @@
+"""
+Build a TensorRT engine for the TSR image encoder and backbone
+
+Usage:
+    python trt_build.py [--output outputs/engines/tsr_encoder.plan]
+
+web_app.py picks the engine up automatically on CUDA if the file exists.
+Mesh extraction keeps running through the PyTorch model.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+import torch
+import torch.nn as nn
+from einops import rearrange
+
+logger = logging.getLogger(__name__)
+
+# Next to web_app.py's output directory, independent of the CWD
+ENGINE_PATH = Path(__file__).resolve().parent / "outputs" / "engines" / "tsr_encoder.plan"
+INPUT_NAME = "rgb_cond"
+OUTPUT_NAME = "scene_codes"
+
+
+class TSREncoder(nn.Module):
+    """Tensor-only part of TSR.forward: preprocessed image -> scene codes"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, rgb_cond):
+        # rgb_cond: B C H W, already resized to cond_image_size
+        input_image_tokens = self.model.image_tokenizer(rgb_cond[:, None])
+        input_image_tokens = rearrange(
+            input_image_tokens, "B Nv C Nt -> B (Nv Nt) C", Nv=1
+        )
+        tokens = self.model.tokenizer(rgb_cond.shape[0])
+        tokens = self.model.backbone(
+            tokens,
+            encoder_hidden_states=input_image_tokens,
+        )
+        return self.model.post_processor(self.model.tokenizer.detokenize(tokens))
+
+
+class TSR_TRT:
+    """
+    Drop-in for the TSR model that runs the encoder from a TensorRT engine
+
+    Exposes the same __call__(image, device) and extract_mesh(...) as TSR.
+    Anything the engine was not built for (batch size != 1) goes to the
+    PyTorch model.
+    """
+
+    def __init__(self, model, engine_path=ENGINE_PATH):
+        import tensorrt as trt
+
+        self.model = model
+        runtime = trt.Runtime(trt.Logger(trt.Logger.WARNING))
+        self.engine = runtime.deserialize_cuda_engine(Path(engine_path).read_bytes())
+        if self.engine is None:
+            raise RuntimeError(f"Failed to deserialize TensorRT engine {engine_path}")
+        self.context = self.engine.create_execution_context()
+        self.input_shape = tuple(self.engine.get_tensor_shape(INPUT_NAME))
+        self.output_shape = tuple(self.engine.get_tensor_shape(OUTPUT_NAME))
+
+    def __call__(self, image, device):
+        rgb_cond = self.model.image_processor(image, self.model.cfg.cond_image_size)
+        rgb_cond = rgb_cond.to(device).permute(0, 3, 1, 2).contiguous()
+        if tuple(rgb_cond.shape) != self.input_shape:
+            return self.model(image, device=device)
+
+        scene_codes = torch.empty(self.output_shape, dtype=torch.float32, device=device)
+        stream = torch.cuda.current_stream()
+        self.context.set_tensor_address(INPUT_NAME, rgb_cond.data_ptr())
+        self.context.set_tensor_address(OUTPUT_NAME, scene_codes.data_ptr())
+        if not self.context.execute_async_v3(stream.cuda_stream):
+            raise RuntimeError("TensorRT execution failed")
+        return scene_codes
+
+    def extract_mesh(self, *args, **kwargs):
+        return self.model.extract_mesh(*args, **kwargs)
+
+    def __getattr__(self, name):
+        # renderer, cfg, image_processor, ... come from the wrapped model
+        return getattr(self.model, name)
+
+
+def export_onnx(model, onnx_path, device):
+    """Export the encoder + backbone to ONNX at the model's conditioning size"""
+    size = model.cfg.cond_image_size
+    encoder = TSREncoder(model).eval()
+    dummy = torch.rand(1, 3, size, size, device=device)
+    with torch.no_grad():
+        torch.onnx.export(
+            encoder,
+            (dummy,),
+            str(onnx_path),
+            input_names=[INPUT_NAME],
+            output_names=[OUTPUT_NAME],
+            opset_version=17,
+        )
+
+
+def build_engine(onnx_path, engine_path, workspace_gb=4):
+    """Build and serialize a TensorRT engine, BF16 where the GPU supports it"""
+    import tensorrt as trt
+
+    trt_logger = trt.Logger(trt.Logger.WARNING)
+    builder = trt.Builder(trt_logger)
+    network = builder.create_network(0)
+    parser = trt.OnnxParser(network, trt_logger)
+    if not parser.parse(Path(onnx_path).read_bytes()):
+        errors = [str(parser.get_error(i)) for i in range(parser.num_errors)]
+        raise RuntimeError("Failed to parse ONNX model:\n" + "\n".join(errors))
+
+    config = builder.create_builder_config()
+    config.set_memory_pool_limit(trt.MemoryPoolType.WORKSPACE, workspace_gb << 30)
+    if hasattr(trt.BuilderFlag, "BF16") and torch.cuda.is_bf16_supported():
+        config.set_flag(trt.BuilderFlag.BF16)
+    elif builder.platform_has_fast_fp16:
+        config.set_flag(trt.BuilderFlag.FP16)
+
+    serialized = builder.build_serialized_network(network, config)
+    if serialized is None:
+        raise RuntimeError("TensorRT engine build failed")
+    Path(engine_path).write_bytes(bytes(serialized))
+
+
+def main():
+    from tsr.system import TSR
+
+    parser = argparse.ArgumentParser(description="Build the TSR TensorRT engine")
+    parser.add_argument("--output", type=Path, default=ENGINE_PATH, help="Engine file to write")
+    parser.add_argument("--workspace-gb", type=int, default=4, help="Builder workspace size")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not torch.cuda.is_available():
+        raise SystemExit("TensorRT engines need a CUDA device")
+
+    device = "cuda:0"
+    model = TSR.from_pretrained(
+        "stabilityai/TripoSR",
+        config_name="config.yaml",
+        weight_name="model.ckpt",
+    )
+    model.to(device)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    onnx_path = args.output.with_suffix(".onnx")
+    logger.info(f"Exporting ONNX model to {onnx_path}")
+    export_onnx(model, onnx_path, device)
+    logger.info(f"Building TensorRT engine {args.output}")
+    build_engine(onnx_path, args.output, args.workspace_gb)
+    logger.info("Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -468,7 +468,18 @@ def save_video(
     writer.close()
 
 
+# -90 deg about x followed by +90 deg about y, composed once: (x, y, z) -> (-y, z, -x)
+GRADIO_3D_ORIENTATION = np.array(
+    [
+        [0, -1, 0, 0],
+        [0, 0, 1, 0],
+        [-1, 0, 0, 0],
+        [0, 0, 0, 1],
+    ],
+    dtype=np.float64,
+)
+
+
 def to_gradio_3d_orientation(mesh):
-    mesh.apply_transform(trimesh.transformations.rotation_matrix(-np.pi/2, [1, 0, 0]))
-    mesh.apply_transform(trimesh.transformations.rotation_matrix(np.pi/2, [0, 1, 0]))
+    mesh.apply_transform(GRADIO_3D_ORIENTATION)
     return mesh
@@ -1,24 +1,39 @@
 import logging
 import os
+import shutil
 import tempfile
+import gzip
+import hashlib
+import threading
 import time
-import base64
 import io
+import json
 import zipfile
 import uuid
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
-from flask import Flask, request, jsonify, send_file, render_template_string
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
+from cachetools import LRUCache, TTLCache
 import numpy as np
+import pybase64
 import rembg
+import onnxruntime as ort
 import torch
 from PIL import Image
 import trimesh
 
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
 from tsr.system import TSR
-from tsr.utils import remove_background, resize_foreground, to_gradio_3d_orientation
+from tsr.utils import remove_background, to_gradio_3d_orientation
 from tsr.bake_texture import bake_texture
+from trt_build import TSR_TRT, ENGINE_PATH
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -36,6 +51,12 @@ else:
     device = "cpu"
     logger.info("Using CPU device")
 
+# Autocast dtype for the forward on CUDA: BF16 where the GPU has it, else FP16 (T4/V100)
+if device.startswith("cuda") and torch.cuda.is_bf16_supported():
+    autocast_dtype = torch.bfloat16
+else:
+    autocast_dtype = torch.float16
+
 # Load TripoSR model
 logger.info("Loading TripoSR model...")
 model = TSR.from_pretrained(
@@ -47,101 +68,484 @@ model.renderer.set_chunk_size(8192)
 model.to(device)
 logger.info("Model loaded successfully")
 
-# Initialize background removal
-rembg_session = rembg.new_session()
+def compile_model():
+    """Compile the image encoder and transformer backbone; warmed up after the batch worker starts"""
+    # Fixed-shape submodules only: the input is always resized to cond_image_size,
+    # while the decoder sees variable chunk sizes during mesh extraction
+    model.image_tokenizer = torch.compile(model.image_tokenizer, mode="reduce-overhead", fullgraph=False)
+    model.backbone = torch.compile(model.backbone, mode="reduce-overhead", fullgraph=False)
+
+def uncompile_model():
+    """Put the eager submodules back after a failed compile"""
+    model.image_tokenizer = getattr(model.image_tokenizer, '_orig_mod', model.image_tokenizer)
+    model.backbone = getattr(model.backbone, '_orig_mod', model.backbone)
+
+# Prefer a prebuilt TensorRT engine (see trt_build.py), else torch.compile
+tsr_runner = model
+if torch.cuda.is_available() and ENGINE_PATH.exists():
+    try:
+        tsr_runner = TSR_TRT(model, ENGINE_PATH)
+        logger.info(f"Using TensorRT engine {ENGINE_PATH}")
+    except Exception as e:
+        logger.warning(f"Failed to load TensorRT engine, using PyTorch: {e}")
 
-# Create output directory
-output_dir = Path("outputs")
+model_compiled = False
+if tsr_runner is model and torch.cuda.is_available() and os.environ.get("TSR_COMPILE", "1") == "1":
+    try:
+        compile_model()
+        model_compiled = True
+    except Exception as e:
+        uncompile_model()
+        logger.warning(f"torch.compile failed, running eagerly: {e}")
+
+# Create output directory; anchored to this file rather than the CWD, since
+# send_file/send_from_directory resolve relative paths against app.root_path
+output_dir = Path(__file__).resolve().parent / "outputs"
 output_dir.mkdir(exist_ok=True)
+sessions_dir = output_dir / "sessions"
 
-def preprocess_image(image_data, do_remove_background=True, foreground_ratio=0.85):
-    """Preprocess the input image"""
+# Initialize background removal
+def get_rembg_providers():
+    """ONNX Runtime providers for rembg, fastest first; TensorRT engines are cached on disk"""
+    providers = ['CPUExecutionProvider']
+    if device.startswith('cuda'):
+        providers = [
+            ('TensorrtExecutionProvider', {
+                'trt_fp16_enable': True,
+                'trt_engine_cache_enable': True,
+                'trt_engine_cache_path': str(output_dir / "trt_cache"),
+            }),
+            ('CUDAExecutionProvider', {'device_id': 0}),
+            'CPUExecutionProvider',
+        ]
+    available = ort.get_available_providers()
+    return [p for p in providers if (p[0] if isinstance(p, tuple) else p) in available]
+
+# u2netp is ~4x fewer FLOPs than u2net with little quality loss on single objects
+rembg_session = rembg.new_session(
+    model_name=os.environ.get("REMBG_MODEL", "u2netp"),
+    providers=get_rembg_providers(),
+)
+
+def remove_session_dir(session_id):
+    """Delete a QR session's images on the I/O pool, outside sessions_lock"""
+    io_pool.submit(shutil.rmtree, sessions_dir / session_id, ignore_errors=True)
+
+class UploadSessionCache(TTLCache):
+    """TTL cache for QR upload sessions that also removes their image directories"""
+    
+    def expire(self, time=None):
+        expired = super().expire(time) or []
+        for session_id, _ in expired:
+            remove_session_dir(session_id)
+        return expired
+    
+    def popitem(self):
+        session_id, session_data = super().popitem()
+        remove_session_dir(session_id)
+        return session_id, session_data
+
+# Generation tasks; forwards are coalesced by the batch worker and mesh
+# extraction is serialized by extract_lock, so device memory stays bounded
+MAX_BATCH = 4
+BATCH_WINDOW = 0.05
+gpu_pool = ThreadPoolExecutor(max_workers=MAX_BATCH, thread_name_prefix='gpu')
+io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='io')
+extract_lock = threading.Lock()
+request_queue = queue.Queue()
+
+copy_stream = torch.cuda.Stream() if device.startswith('cuda') else None
+
+def upload_images(images):
+    """Copy PIL images to the GPU as HWC float tensors via pinned memory on a side stream"""
+    tensors = []
+    with torch.cuda.stream(copy_stream):
+        for image in images:
+            arr = np.asarray(image if image.mode == 'RGB' else image.convert('RGB'))
+            host = torch.empty(arr.shape, dtype=torch.uint8, pin_memory=True)
+            host.numpy()[...] = arr
+            tensors.append(host.to(device, non_blocking=True).float().div_(255.0))
+    
+    compute_stream = torch.cuda.current_stream()
+    compute_stream.wait_stream(copy_stream)
+    for tensor in tensors:
+        tensor.record_stream(compute_stream)
+    return tensors
+
+def forward_batch(images):
+    """Run one TSR forward over a list of images"""
+    if copy_stream is not None:
+        # TSR's preprocessor passes device tensors through without another copy
+        images = upload_images(images)
+    
+    with torch.inference_mode(), torch.autocast(
+        device_type='cuda', dtype=autocast_dtype, enabled=device.startswith('cuda')
+    ):
+        return tsr_runner(images, device=device).float()
+
+def batch_worker():
+    """Coalesce forward requests arriving within BATCH_WINDOW into one batch"""
+    while True:
+        batch = [request_queue.get()]
+        deadline = time.monotonic() + BATCH_WINDOW
+        while len(batch) < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(request_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        images = [image for image, _ in batch]
+        try:
+            scene_codes = forward_batch(images)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            continue
+        for i, (_, future) in enumerate(batch):
+            # Cloned so a cached entry does not keep the whole batch alive on the GPU
+            future.set_result(scene_codes[i:i + 1].clone())
+
+threading.Thread(target=batch_worker, name='tsr-batch', daemon=True).start()
+
+def warmup_compiled_model():
+    """Compile and record the CUDA graphs on the batch worker thread"""
+    logger.info("Compiling TSR model, this takes a while on first start...")
+    start = time.time()
+    dummy = Image.new("RGB", (512, 512), (127, 127, 127))
+    # cudagraph trees are per thread, so the graphs must be recorded by the thread
+    # that runs real forwards. The compiled submodules specialise on the batch size,
+    # so every size the worker can form is queued at once; reduce-overhead records
+    # on the second call, so each size runs twice
+    for batch_size in range(1, MAX_BATCH + 1):
+        for _ in range(2):
+            futures = [Future() for _ in range(batch_size)]
+            for future in futures:
+                request_queue.put((dummy, future))
+            for future in futures:
+                future.result(timeout=600)
+    logger.info(f"TSR model compiled in {time.time() - start:.1f}s")
+
+if model_compiled:
     try:
-        # Decode base64 image
-        if isinstance(image_data, str) and image_data.startswith('data:image'):
-            image_data = image_data.split(',')[1]
-        
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGBA")
-        
-        def fill_background(img):
-            img_array = np.array(img).astype(np.float32) / 255.0
-            img_array = img_array[:, :, :3] * img_array[:, :, 3:4] + (1 - img_array[:, :, 3:4]) * 0.5
-            return Image.fromarray((img_array * 255.0).astype(np.uint8))
-
-        if do_remove_background:
-            image_rgb = image.convert("RGB")
-            image = remove_background(image_rgb, rembg_session)
-            image = resize_foreground(image, foreground_ratio)
-            image = fill_background(image)
-        else:
-            if image.mode == "RGBA":
-                image = fill_background(image)
-            else:
-                image = image.convert("RGB")
-        
-        return image
+        warmup_compiled_model()
     except Exception as e:
-        logger.error(f"Error preprocessing image: {e}")
-        raise
-
-def generate_3d_model(image, mc_resolution=256, formats=["obj", "glb"]):
-    """Generate 3D model from preprocessed image"""
+        uncompile_model()
+        logger.warning(f"torch.compile failed, running eagerly: {e}")
+
+# Latest exported file per format, for /api/download
+last_model_path = {}
+
+# Scene codes by processed-image hash; each entry is a few MB, kept on device
+scene_code_cache = LRUCache(maxsize=8)
+scene_code_lock = threading.Lock()
+
+# Preprocessed images by id, so /api/generate never re-decodes the upload
+processed_images = TTLCache(maxsize=256, ttl=600)
+processed_lock = threading.Lock()
+
+# Pending and finished generation futures by task id
+tasks = TTLCache(maxsize=256, ttl=3600)
+tasks_lock = threading.Lock()
+
+# Latest stage per task; signalled on every update for /api/task-events streams
+task_progress = TTLCache(maxsize=256, ttl=3600)
+task_changed = threading.Condition(tasks_lock)
+
+def report_progress(task_id, text, progress):
+    """Record the stage a generation task has reached"""
+    if task_id is None:
+        return
+    with task_changed:
+        task_progress[task_id] = {'text': text, 'progress': progress}
+        task_changed.notify_all()
+
+# QR upload sessions, bounded and expired after an hour
+upload_sessions = UploadSessionCache(maxsize=1024, ttl=3600)
+sessions_lock = threading.Lock()
+# Signalled whenever a session changes, for /api/qr-events streams
+session_changed = threading.Condition(sessions_lock)
+SSE_KEEPALIVE = 15
+# Each open QR stream holds a server thread; after this the client switches to polling
+QR_STREAM_MAX_AGE = 300
+
+IMAGE_FORMATS = ['PNG', 'JPEG', 'WEBP']
+# Extension a stored upload is saved under, picked from the decoded format
+IMAGE_EXTENSIONS = {'PNG': '.png', 'JPEG': '.jpg', 'WEBP': '.webp'}
+PREVIEW_SIZE = 256
+
+def open_image(image_bytes):
+    """Open an upload, only probing the formats we accept; JPEGs decode at reduced size"""
+    image = Image.open(io.BytesIO(image_bytes), formats=IMAGE_FORMATS)
+    if image.format == 'JPEG':
+        # libjpeg scales by 1/2, 1/4 or 1/8 while decoding, never below this size
+        image.draft('RGB', (1024, 1024))
+    return image
+
+def composite_foreground(arr, foreground_ratio, size):
+    """Crop, pad, gray-fill and resize rembg output in one NumPy pass (resize_foreground + fill_background)"""
+    alpha = arr[:, :, 3]
+    rows = np.any(alpha, axis=1)
+    cols = np.any(alpha, axis=0)
+    # Same (exclusive max) crop as resize_foreground
+    y1, y2 = np.argmax(rows), len(rows) - 1 - np.argmax(rows[::-1])
+    x1, x2 = np.argmax(cols), len(cols) - 1 - np.argmax(cols[::-1])
+    fg = arr[y1:y2, x1:x2]
+    
+    h, w = fg.shape[:2]
+    square = max(h, w)
+    new_size = int(square / foreground_ratio)
+    top = (square - h) // 2 + (new_size - square) // 2
+    left = (square - w) // 2 + (new_size - square) // 2
+    
+    canvas = np.full((new_size, new_size, 3), 128, dtype=np.uint8)
+    rgb = fg[:, :, :3].astype(np.uint16)
+    a = fg[:, :, 3:4].astype(np.uint16)
+    canvas[top:top + h, left:left + w] = (rgb * a + (255 - a) * 128) // 255
+    
+    if cv2 is not None:
+        canvas = cv2.resize(canvas, (size, size), interpolation=cv2.INTER_AREA)
+        return Image.fromarray(canvas, 'RGB')
+    return Image.fromarray(canvas, 'RGB').resize((size, size), Image.BILINEAR, reducing_gap=None)
+
+def decode_stage(job):
+    """Pipeline stage 1: decode the upload to RGBA"""
+    image = open_image(job.pop('image_bytes'))
+    # convert() forces the decode here rather than lazily in a later stage
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    else:
+        image.load()
+    job['image'] = image
+    return job
+
+def background_stage(job):
+    """Pipeline stage 2: rembg, when requested"""
+    if job['do_remove_background']:
+        job['image'] = remove_background(job['image'].convert("RGB"), rembg_session)
+    return job
+
+def prep_stage(job):
+    """Pipeline stage 3: model-ready image plus its JPEG preview"""
+    image = job['image']
+    if job['do_remove_background']:
+        image = composite_foreground(np.asarray(image), job['foreground_ratio'], model.cfg.cond_image_size)
+    else:
+        # Blend over mid-gray in integer space, no float32 copy of the image
+        arr = np.asarray(image)
+        rgb = arr[:, :, :3].astype(np.uint16)
+        alpha = arr[:, :, 3:4].astype(np.uint16)
+        out = (rgb * alpha + (255 - alpha) * 128) // 255
+        image = Image.fromarray(out.astype(np.uint8), 'RGB')
+    
+    # Small JPEG preview for display only; resized straight from the
+    # processed image rather than from a full-size copy
+    scale = min(1.0, PREVIEW_SIZE / max(image.size))
+    preview_size = tuple(max(1, round(side * scale)) for side in image.size)
+    preview = image.resize(preview_size, Image.BILINEAR, reducing_gap=2.0)
+    buffer = io.BytesIO()
+    preview.save(buffer, format='JPEG', quality=70, optimize=False)
+    
+    # Cached for /api/generate at the size TSR resizes to anyway, so each entry
+    # in processed_images stays under 1 MB whatever the upload resolution
+    size = model.cfg.cond_image_size
+    if image.size != (size, size):
+        image = image.resize((size, size), Image.BILINEAR)
+    return image, buffer.getvalue()
+
+def pipeline_worker(work, inbox, outbox):
+    """Run one upload stage, handing each job on to the next stage's queue"""
+    while True:
+        job, future = inbox.get()
+        try:
+            job = work(job)
+        except Exception as e:
+            logger.error(f"Error preprocessing image: {e}")
+            future.set_exception(e)
+            continue
+        if outbox is None:
+            future.set_result(job)
+        else:
+            # Blocks while the next stage is behind, bounding the jobs in flight
+            outbox.put((job, future))
+
+# Upload preprocessing as three staged workers joined by bounded queues, so one
+# upload's decode overlaps another's background removal
+upload_queue = queue.Queue(maxsize=2)
+background_queue = queue.Queue(maxsize=2)
+prep_queue = queue.Queue(maxsize=2)
+for name, work, inbox, outbox in (
+    ('decode', decode_stage, upload_queue, background_queue),
+    ('rembg', background_stage, background_queue, prep_queue),
+    ('prep', prep_stage, prep_queue, None),
+):
+    threading.Thread(
+        target=pipeline_worker, args=(work, inbox, outbox), name=f'upload-{name}', daemon=True
+    ).start()
+
+def preprocess_image(image_bytes, do_remove_background=True, foreground_ratio=0.85):
+    """Preprocess an upload through the stage pipeline; returns (image, preview JPEG bytes)"""
+    future = Future()
+    upload_queue.put(({
+        'image_bytes': image_bytes,
+        'do_remove_background': do_remove_background,
+        'foreground_ratio': foreground_ratio,
+    }, future))
+    return future.result(timeout=300)
+
+def generate_3d_model(image, mc_resolution=256, formats=["obj", "glb"], task_id=None):
+    """Generate 3D model from preprocessed image, reporting stages for task_id"""
     try:
         logger.info("Generating 3D model...")
+        report_progress(task_id, 'Creating triplane representation...', 20)
+        
+        # Re-exports of the same image (e.g. another mc_resolution) skip the network
+        key = hashlib.blake2b(image.tobytes(), digest_size=16).digest()
+        with scene_code_lock:
+            scene_codes = scene_code_cache.get(key)
+        
+        if scene_codes is None:
+            # Concurrent requests share one batched forward, run with BF16/FP16
+            # autocast for the encoder/backbone matmuls on GPU
+            future = Future()
+            request_queue.put((image, future))
+            scene_codes = future.result(timeout=300)
+            with scene_code_lock:
+                scene_code_cache[key] = scene_codes
+        else:
+            logger.info("Reusing cached scene codes")
         
-        # Generate scene codes
-        with torch.no_grad():
-            scene_codes = model([image], device=device)
-        
-        # Extract mesh
-        mesh = model.extract_mesh(scene_codes, True, resolution=mc_resolution)[0]
+        # Extract mesh; density queries and marching cubes stay in FP32
+        report_progress(task_id, 'Generating mesh...', 50)
+        with extract_lock, torch.inference_mode():
+            mesh = tsr_runner.extract_mesh(scene_codes, True, resolution=mc_resolution)[0]
         mesh = to_gradio_3d_orientation(mesh)
         
-        # Save in requested formats
+        # Save in requested formats, each export on its own I/O worker with its
+        # own copy of the mesh, since trimesh's lazy cache is not thread-safe
+        report_progress(task_id, 'Exporting model files...', 85)
         output_files = {}
-        timestamp = str(int(time.time()))
+        # The suffix keeps concurrent generations in the same second apart
+        model_id = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
         
+        exports = {}
         for format_type in formats:
-            filename = f"model_{timestamp}.{format_type}"
+            filename = f"model_{model_id}.{format_type}"
             filepath = output_dir / filename
-            mesh.export(str(filepath))
+            exports[format_type] = (filepath, io_pool.submit(mesh.copy().export, str(filepath)))
+        
+        # A failed format is dropped instead of failing the whole request
+        for format_type, (filepath, export) in exports.items():
+            error = export.exception()
+            if error is not None:
+                logger.error(f"Failed to export {format_type}: {error}")
+                continue
             output_files[format_type] = str(filepath)
         
+        if not output_files:
+            raise RuntimeError("Mesh export failed for every format")
+        last_model_path.update(output_files)
+        
         logger.info("3D model generated successfully")
         return output_files, scene_codes
     except Exception as e:
         logger.error(f"Error generating 3D model: {e}")
         raise
 
+def run_generate_task(image, mc_resolution, task_id):
+    """Generate a model and return a download URL per format"""
+    output_files, scene_codes = generate_3d_model(image, mc_resolution, task_id=task_id)
+    return {
+        format_type: f"/models/{Path(filepath).name}"
+        for format_type, filepath in output_files.items()
+    }
+
+# Started by the first /api/warmup call, shared by every later one
+warmup_future = None
+warmup_lock = threading.Lock()
+
+def warmup():
+    """Run one dummy image through rembg, the batched forward and mesh extraction"""
+    start = time.time()
+    dummy = Image.new("RGB", (512, 512), (127, 127, 127))
+    # First runs pay for ORT/TensorRT session setup and CUDA kernel selection
+    remove_background(dummy, rembg_session)
+    future = Future()
+    request_queue.put((dummy, future))
+    scene_codes = future.result(timeout=300)
+    with extract_lock, torch.inference_mode():
+        tsr_runner.extract_mesh(scene_codes, True, resolution=32)
+    logger.info(f"Warmup finished in {time.time() - start:.1f}s")
+
 @app.route('/')
 def index():
     """Serve the main application"""
-    return render_template_string(HTML_TEMPLATE)
+    # The page has no template variables; serve the pre-compressed copy when possible
+    if 'gzip' in request.accept_encodings:
+        response = Response(INDEX_HTML_GZ, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(HTML_TEMPLATE, mimetype='text/html')
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/api/warmup', methods=['POST'])
+def warmup_model():
+    """Start the one-off warmup pass in the background"""
+    global warmup_future
+    with warmup_lock:
+        if warmup_future is None:
+            warmup_future = gpu_pool.submit(warmup)
+        future = warmup_future
+    
+    if future.done() and future.exception() is not None:
+        logger.error(f"Error in warmup: {future.exception()}")
+        return jsonify({'error': str(future.exception())}), 500
+    if future.done():
+        return jsonify({'success': True, 'status': 'ready'})
+    return jsonify({'success': True, 'status': 'warming'}), 202
 
 @app.route('/api/upload', methods=['POST'])
 def upload_image():
     """Handle image upload and preprocessing"""
     try:
-        data = request.json
-        image_data = data.get('image')
-        do_remove_background = data.get('removeBackground', True)
-        foreground_ratio = data.get('foregroundRatio', 0.85)
+        file = request.files.get('image')
+        if file is not None:
+            # multipart/form-data: the raw file, no base64 round-trip
+            image_bytes = file.read()
+            do_remove_background = request.form.get('removeBackground', 'true') != 'false'
+            foreground_ratio = request.form.get('foregroundRatio', 0.85, type=float)
+        else:
+            # Older clients post a base64 data URL in JSON
+            data = request.json
+            image_data = data.get('image')
+            do_remove_background = data.get('removeBackground', True)
+            foreground_ratio = data.get('foregroundRatio', 0.85)
+            
+            if image_data and image_data.startswith('data:image'):
+                image_data = image_data.partition(',')[2]
+            image_bytes = pybase64.b64decode(image_data, validate=False) if image_data else b''
         
-        if not image_data:
+        if not image_bytes:
             return jsonify({'error': 'No image data provided'}), 400
         
-        # Preprocess image
-        processed_image = preprocess_image(image_data, do_remove_background, foreground_ratio)
+        # Preprocess image; concurrent uploads overlap across the pipeline stages
+        processed_image, preview_jpeg = preprocess_image(image_bytes, do_remove_background, foreground_ratio)
+        
+        # Keep the model-ready image server-side for /api/generate
+        image_id = uuid.uuid4().hex
+        with processed_lock:
+            processed_images[image_id] = processed_image
         
-        # Convert processed image to base64
-        buffer = io.BytesIO()
-        processed_image.save(buffer, format='PNG')
-        processed_image_b64 = base64.b64encode(buffer.getvalue()).decode()
+        processed_image_b64 = pybase64.b64encode_as_string(preview_jpeg)
         
         return jsonify({
             'success': True,
-            'processedImage': f"data:image/png;base64,{processed_image_b64}"
+            'image_id': image_id,
+            'processedImage': f"data:image/jpeg;base64,{processed_image_b64}"
         })
     except Exception as e:
         logger.error(f"Error in upload_image: {e}")
@@ -152,53 +556,135 @@ def generate_model():
     """Generate 3D model from processed image"""
     try:
         data = request.json
+        image_id = data.get('image_id')
         image_data = data.get('processedImage')
         mc_resolution = data.get('mcResolution', 256)
         
-        if not image_data:
+        if image_id:
+            # Not popped, so the same upload can be regenerated at another resolution
+            with processed_lock:
+                image = processed_images.get(image_id)
+            if image is None:
+                return jsonify({'error': 'Processed image expired, please upload it again'}), 410
+        elif image_data:
+            # Decode the processed image
+            if image_data.startswith('data:image'):
+                image_data = image_data.partition(',')[2]
+            
+            image_bytes = pybase64.b64decode(image_data, validate=False)
+            image = open_image(image_bytes)
+        else:
             return jsonify({'error': 'No processed image data provided'}), 400
         
-        # Decode the processed image
-        if image_data.startswith('data:image'):
-            image_data = image_data.split(',')[1]
-        
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Generate 3D model
-        output_files, scene_codes = generate_3d_model(image, mc_resolution)
-        
-        # Read files and encode as base64
-        model_data = {}
-        for format_type, filepath in output_files.items():
-            with open(filepath, 'rb') as f:
-                file_data = base64.b64encode(f.read()).decode()
-                model_data[format_type] = file_data
+        # Queue generation; the client follows /api/task-events/<task_id>
+        # (or polls /api/task/<task_id>) for progress and the result
+        task_id = uuid.uuid4().hex
+        report_progress(task_id, 'Waiting for the GPU...', 5)
+        with tasks_lock:
+            tasks[task_id] = future = gpu_pool.submit(run_generate_task, image, mc_resolution, task_id)
+        # Outside the lock: the callback runs inline if the task already finished
+        future.add_done_callback(lambda _: report_progress(task_id, 'Finalizing model...', 100))
         
         return jsonify({
             'success': True,
-            'models': model_data,
-            'message': 'Model generated successfully'
-        })
+            'task_id': task_id
+        }), 202
     except Exception as e:
         logger.error(f"Error in generate_model: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/task/<task_id>')
+def get_task(task_id):
+    """Check a generation task and return the models once it has finished"""
+    with tasks_lock:
+        future = tasks.get(task_id)
+    if future is None:
+        return jsonify({'error': 'Unknown task'}), 404
+    
+    state, status_code = task_state(task_id, future)
+    return jsonify(state), status_code
+
+def task_state(task_id, future):
+    """Status payload and HTTP status code for a generation task"""
+    if not future.done():
+        state = {'success': True, 'status': 'pending'}
+        with tasks_lock:
+            state.update(task_progress.get(task_id, {}))
+        return state, 200
+    
+    try:
+        model_data = future.result()
+    except Exception as e:
+        logger.error(f"Error in generation task {task_id}: {e}")
+        return {'error': str(e)}, 500
+    
+    return {
+        'success': True,
+        'status': 'completed',
+        'models': model_data,
+        'message': 'Model generated successfully'
+    }, 200
+
+@app.route('/api/task-events/<task_id>')
+def task_events(task_id):
+    """Push generation progress, then the task result, as server-sent events"""
+    with tasks_lock:
+        future = tasks.get(task_id)
+    if future is None:
+        return jsonify({'error': 'Unknown task'}), 404
+    
+    def stream():
+        last_progress = None
+        while not future.done():
+            with task_changed:
+                progress = task_progress.get(task_id)
+                if progress == last_progress and not future.done():
+                    task_changed.wait(timeout=SSE_KEEPALIVE)
+                    progress = task_progress.get(task_id)
+            
+            if progress == last_progress:
+                yield ": keepalive\n\n"
+                continue
+            
+            last_progress = progress
+            yield f"data: {json.dumps(progress)}\n\n"
+        
+        state, _ = task_state(task_id, future)
+        yield f"event: done\ndata: {json.dumps(state)}\n\n"
+    
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/download/<model_format>')
 def download_model(model_format):
     """Download generated model file"""
     try:
-        # Find the most recent model file
-        files = list(output_dir.glob(f"model_*.{model_format}"))
-        if not files:
+        # Most recent model file; only scan the directory for files from before a restart
+        latest_file = last_model_path.get(model_format)
+        if latest_file is None:
+            # Names embed a fixed-width epoch timestamp, so lexical order is chronological
+            latest_file = max(output_dir.glob(f"model_*.{model_format}"), default=None)
+        if latest_file is None:
             return jsonify({'error': 'No model file found'}), 404
         
-        latest_file = max(files, key=os.path.getctime)
         return send_file(latest_file, as_attachment=True)
     except Exception as e:
         logger.error(f"Error downloading model: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/models/<filename>')
+def serve_model(filename):
+    """Serve a generated model file as an attachment"""
+    if not filename.startswith('model_'):
+        return jsonify({'error': 'No model file found'}), 404
+    # send_from_directory rejects paths that escape outputs/
+    return send_from_directory(
+        output_dir, filename, as_attachment=True,
+        download_name=f"triposr_model{Path(filename).suffix}"
+    )
+
 # QR Code upload endpoints
 @app.route('/api/qr-upload-session', methods=['POST'])
 def create_qr_upload_session():
@@ -207,14 +693,12 @@ def create_qr_upload_session():
         session_id = str(uuid.uuid4())
         
         # Store session in memory (in production, use Redis or database)
-        if not hasattr(app, 'upload_sessions'):
-            app.upload_sessions = {}
-        
-        app.upload_sessions[session_id] = {
-            'images': [],
-            'created_at': time.time(),
-            'status': 'waiting'
-        }
+        with sessions_lock:
+            upload_sessions[session_id] = {
+                'images': [],
+                'created_at': time.time(),
+                'status': 'waiting'
+            }
         
         # Get the actual host IP that the phone can reach
         host_ip = request.host.split(':')[0]
@@ -246,72 +730,167 @@ def create_qr_upload_session():
 @app.route('/mobile-upload/<session_id>')
 def mobile_upload_page(session_id):
     """Mobile upload page for QR code scanning"""
-    return render_template_string(MOBILE_UPLOAD_TEMPLATE, session_id=session_id)
+    return MOBILE_UPLOAD_PAGE.render(session_id=session_id)
 
 @app.route('/api/mobile-upload/<session_id>', methods=['POST'])
 def handle_mobile_upload(session_id):
     """Handle image upload from mobile device"""
     try:
-        if not hasattr(app, 'upload_sessions') or session_id not in app.upload_sessions:
-            return jsonify({'error': 'Invalid session'}), 404
+        with sessions_lock:
+            if upload_sessions.get(session_id) is None:
+                return jsonify({'error': 'Invalid session'}), 404
         
         uploaded_files = request.files.getlist('images')
         
         if not uploaded_files:
             return jsonify({'error': 'No images uploaded'}), 400
         
-        session_data = app.upload_sessions[session_id]
-        
-        # Process uploaded images
-        processed_images = []
+        # Only real images are kept: each upload is decoded, and its extension
+        # and served mimetype come from the decoded format, never the client
+        decoded = []
         for file in uploaded_files[:4]:  # Limit to 4 images
             if file and file.filename:
-                file_content = file.read()
-                file_b64 = base64.b64encode(file_content).decode()
-                file_type = file.content_type or 'image/jpeg'
-                data_url = f"data:{file_type};base64,{file_b64}"
-                processed_images.append(data_url)
-        
-        session_data['images'] = processed_images
-        session_data['status'] = 'completed'
-        session_data['updated_at'] = time.time()
+                image_bytes = file.read()
+                try:
+                    image = open_image(image_bytes)
+                    image.load()
+                except Exception:
+                    return jsonify({'error': f'Unsupported image file: {file.filename}'}), 400
+                decoded.append((image_bytes, image.format))
+        
+        # A repeat upload replaces the session's images rather than adding to them
+        session_dir = sessions_dir / session_id
+        shutil.rmtree(session_dir, ignore_errors=True)
+        session_dir.mkdir(parents=True, exist_ok=True)
+        
+        stored_images = []
+        for idx, (image_bytes, image_format) in enumerate(decoded):
+            path = session_dir / f"img_{idx}{IMAGE_EXTENSIONS[image_format]}"
+            path.write_bytes(image_bytes)
+            stored_images.append({
+                'path': str(path),
+                'mimetype': Image.MIME[image_format]
+            })
+        
+        with sessions_lock:
+            session_data = upload_sessions.get(session_id)
+            if session_data is not None:
+                session_data['images'] = stored_images
+                session_data['status'] = 'completed'
+                session_data['updated_at'] = time.time()
+                session_changed.notify_all()
+        
+        if session_data is None:
+            # Expired while the files were being written; nothing will serve them
+            remove_session_dir(session_id)
+            return jsonify({'error': 'Session expired'}), 410
         
         return jsonify({
             'success': True,
-            'message': f'Successfully uploaded {len(processed_images)} images',
-            'image_count': len(processed_images)
+            'message': f'Successfully uploaded {len(stored_images)} images',
+            'image_count': len(stored_images)
         })
     
     except Exception as e:
         logger.error(f"Error handling mobile upload: {e}")
         return jsonify({'error': str(e)}), 500
 
+def qr_session_state(session_id, session_data):
+    """Status payload for a QR upload session"""
+    images = session_data.get('images', [])
+    return {
+        'success': True,
+        'status': session_data['status'],
+        'images': [f"/api/session-image/{session_id}/{idx}" for idx in range(len(images))],
+        'image_count': len(images)
+    }
+
+@app.route('/api/qr-events/<session_id>')
+def qr_events(session_id):
+    """Push QR session state changes as server-sent events"""
+    def stream():
+        last_state = None
+        deadline = time.monotonic() + QR_STREAM_MAX_AGE
+        while True:
+            if time.monotonic() > deadline:
+                yield "event: timeout\ndata: {}\n\n"
+                return
+            with session_changed:
+                session_data = upload_sessions.get(session_id)
+                if session_data is not None and qr_session_state(session_id, session_data) == last_state:
+                    # Woken by handle_mobile_upload; the timeout only drives keepalives
+                    session_changed.wait(timeout=SSE_KEEPALIVE)
+                    session_data = upload_sessions.get(session_id)
+            
+            if session_data is None:
+                yield "event: expired\ndata: {}\n\n"
+                return
+            
+            state = qr_session_state(session_id, session_data)
+            if state == last_state:
+                yield ": keepalive\n\n"
+                continue
+            
+            last_state = state
+            yield f"data: {json.dumps(state)}\n\n"
+            if state['status'] == 'completed':
+                return
+    
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/check-qr-session/<session_id>')
 def check_qr_session(session_id):
     """Check status of QR upload session"""
     try:
-        if not hasattr(app, 'upload_sessions') or session_id not in app.upload_sessions:
-            return jsonify({'error': 'Invalid session'}), 404
-        
-        session_data = app.upload_sessions[session_id]
-        
-        # Clean up old sessions (older than 1 hour)
-        current_time = time.time()
-        if current_time - session_data['created_at'] > 3600:
-            del app.upload_sessions[session_id]
+        # Sessions are only created by this page, so a missing one has expired
+        with sessions_lock:
+            session_data = upload_sessions.get(session_id)
+            state = qr_session_state(session_id, session_data) if session_data is not None else None
+        if state is None:
             return jsonify({'error': 'Session expired'}), 410
         
-        return jsonify({
-            'success': True,
-            'status': session_data['status'],
-            'images': session_data.get('images', []),
-            'image_count': len(session_data.get('images', []))
-        })
+        # Status and image count fully determine the payload, so an unchanged
+        # session is answered with 304
+        etag = hashlib.blake2b(
+            f"{session_id}:{state['status']}:{state['image_count']}".encode(),
+            digest_size=8
+        ).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = jsonify(state)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     
     except Exception as e:
         logger.error(f"Error checking QR session: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/session-image/<session_id>/<int:idx>')
+def get_session_image(session_id, idx):
+    """Serve an image uploaded to a QR session"""
+    try:
+        with sessions_lock:
+            session_data = upload_sessions.get(session_id)
+            images = session_data.get('images', []) if session_data is not None else None
+        if images is None:
+            return jsonify({'error': 'Invalid session'}), 404
+        
+        if idx >= len(images):
+            return jsonify({'error': 'Image not found'}), 404
+        
+        response = send_file(images[idx]['path'], mimetype=images[idx]['mimetype'])
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        return response
+    
+    except Exception as e:
+        logger.error(f"Error serving session image: {e}")
+        return jsonify({'error': str(e)}), 500
+
 # Mobile upload template
 MOBILE_UPLOAD_TEMPLATE = """
 <!DOCTYPE html>
@@ -391,14 +970,12 @@ MOBILE_UPLOAD_TEMPLATE = """
             previewContainer.classList.remove('hidden');
             
             selectedFiles.forEach((file, index) => {
-                const reader = new FileReader();
-                reader.onload = function(e) {
-                    const img = document.createElement('img');
-                    img.src = e.target.result;
-                    img.className = 'preview-image';
-                    previewGrid.appendChild(img);
-                };
-                reader.readAsDataURL(file);
+                const img = document.createElement('img');
+                img.src = URL.createObjectURL(file);
+                // The decoded image stays on screen; the blob URL can go
+                img.onload = () => URL.revokeObjectURL(img.src);
+                img.className = 'preview-image';
+                previewGrid.appendChild(img);
             });
         }
 
@@ -443,31 +1020,6 @@ HTML_TEMPLATE = """
     <title>2D Image to 3D</title>
     <script src="https://cdn.tailwindcss.com"></script>
     <script src="https://cdn.jsdelivr.net/npm/framer-motion@11.0.0/dist/framer-motion.min.js"></script>
-    <script>
-        // Load QRCode library with proper error handling
-        window.QRCodeLoaded = false;
-        const qrScript = document.createElement('script');
-        qrScript.src = 'https://cdn.jsdelivr.net/npm/qrcode@1.5.3/build/qrcode.min.js';
-        qrScript.onload = function() {
-            window.QRCodeLoaded = true;
-            console.log('QRCode library loaded successfully');
-        };
-        qrScript.onerror = function() {
-            console.error('Failed to load QRCode library from CDN, trying alternative...');
-            // Try alternative CDN
-            const altScript = document.createElement('script');
-            altScript.src = 'https://unpkg.com/qrcode@1.5.3/build/qrcode.min.js';
-            altScript.onload = function() {
-                window.QRCodeLoaded = true;
-                console.log('QRCode library loaded from alternative CDN');
-            };
-            altScript.onerror = function() {
-                console.error('Failed to load QRCode library from all sources');
-            };
-            document.head.appendChild(altScript);
-        };
-        document.head.appendChild(qrScript);
-    </script>
     <link rel="preconnect" href="https://fonts.googleapis.com">
     <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
@@ -503,6 +1055,9 @@ HTML_TEMPLATE = """
             position: relative;
             min-height: 100vh;
             width: 100%;
+            /* Moved by the mouse parallax; keep it on its own compositor layer */
+            will-change: transform;
+            transition: transform 0.3s cubic-bezier(0.4, 0, 0.2, 1);
         }
         
         /* Video-like animated overlay */
@@ -624,6 +1179,14 @@ HTML_TEMPLATE = """
             position: relative;
         }
         
+        /* Glow on hover; !important to win over the base shadow above */
+        .enhanced-glass:hover {
+            box-shadow: 
+                0 20px 60px rgba(0, 0, 0, 0.6),
+                0 0 60px rgba(147, 51, 234, 0.4),
+                inset 0 1px 0 rgba(255, 255, 255, 0.2) !important;
+        }
+        
         .enhanced-glass::before {
             content: '';
             position: absolute;
@@ -754,6 +1317,11 @@ HTML_TEMPLATE = """
                 inset 0 1px 0 rgba(255, 255, 255, 0.3);
         }
         
+        #generate-btn:hover {
+            transform: translateY(-3px) scale(1.05);
+            box-shadow: 0 12px 35px rgba(102, 126, 234, 0.7);
+        }
+        
         .nexio-button:active {
             transform: translateY(0);
             box-shadow: 
@@ -761,6 +1329,35 @@ HTML_TEMPLATE = """
                 inset 0 1px 0 rgba(255, 255, 255, 0.2);
         }
         
+        /* Preview swaps in a slot never reflow or repaint the rest of the page,
+           and off-screen cards and panels are not rendered at all; "auto"
+           remembers the last rendered height so scrolling does not jump */
+        .image-upload-slot {
+            contain: layout paint;
+            content-visibility: auto;
+            contain-intrinsic-block-size: auto 300px;
+        }
+        
+        .enhanced-glass {
+            content-visibility: auto;
+            contain-intrinsic-block-size: auto 400px;
+        }
+        
+        @keyframes float {
+            0%, 100% { transform: translateY(0px) rotate(0deg); }
+            33% { transform: translateY(-8px) rotate(1deg); }
+            66% { transform: translateY(4px) rotate(-1deg); }
+        }
+        
+        @keyframes glow {
+            0%, 100% { box-shadow: 0 0 20px rgba(102, 126, 234, 0.3); }
+            50% { box-shadow: 0 0 60px rgba(147, 51, 234, 0.6); }
+        }
+        
+        .animate-in {
+            animation: glow 2s ease-in-out infinite alternate;
+        }
+        
         /* Custom scrollbar */
         ::-webkit-scrollbar {
             width: 8px;
@@ -837,10 +1434,19 @@ HTML_TEMPLATE = """
                                         <canvas id="qr-code-canvas" width="200" height="200"></canvas>
                                     </div>
                                     <p class="text-white/80 text-sm mb-2">Scan with your phone to upload images</p>
+                                    <!-- All states are rendered once; updateQRStatus only toggles them -->
                                     <div id="qr-status" class="text-center">
-                                        <div class="inline-flex items-center gap-2 text-blue-400">
+                                        <div data-qr-status="waiting" class="inline-flex items-center gap-2 text-blue-400">
                                             <div class="w-2 h-2 bg-blue-400 rounded-full animate-pulse"></div>
-                                            <span class="text-sm">Waiting for upload...</span>
+                                            <span class="text-sm">Waiting for upload... <span class="qr-status-count"></span></span>
+                                        </div>
+                                        <div data-qr-status="completed" class="hidden inline-flex items-center gap-2 text-green-400">
+                                            <div class="w-2 h-2 bg-green-400 rounded-full"></div>
+                                            <span class="text-sm">Upload completed! (<span class="qr-status-count"></span> images)</span>
+                                        </div>
+                                        <div data-qr-status="expired" class="hidden inline-flex items-center gap-2 text-red-400">
+                                            <div class="w-2 h-2 bg-red-400 rounded-full"></div>
+                                            <span class="text-sm">Session expired. Generate new QR code.</span>
                                         </div>
                                     </div>
                                 </div>
@@ -848,7 +1454,7 @@ HTML_TEMPLATE = """
                         </div>
                         
                         <!-- Image Upload Grid -->
-                        <div class="grid grid-cols-2 gap-4 mb-4">
+                        <div id="image-upload-grid" class="grid grid-cols-2 gap-4 mb-4">
                             <!-- Image 1 (Primary) -->
                             <div class="image-upload-slot" data-slot="1">
                                 <div class="upload-area border-2 border-dashed border-blue-400/50 rounded-xl p-4 text-center cursor-pointer hover:border-blue-400/70 transition-colors bg-blue-500/10">
@@ -978,7 +1584,16 @@ HTML_TEMPLATE = """
                             
                             <!-- Model Display -->
                             <div id="model-display" class="hidden w-full h-full">
-                                <canvas id="model-canvas" class="w-full h-full rounded-xl"></canvas>
+                                <!-- Static placeholder; the nested svg origin sits at the centre -->
+                                <svg class="w-full h-full rounded-xl" aria-hidden="true">
+                                    <svg x="50%" y="50%" overflow="visible">
+                                        <path d="M-50 -50h100v100h-100z M-30 -70h100v100h-100z M-50 -50l20 -20 M50 -50l20 -20 M-50 50l20 -20 M50 50l20 -20" fill="none" stroke="#764ba2" stroke-width="2"/>
+                                        <g fill="#ffffff" font-family="Inter" font-size="16" text-anchor="middle">
+                                            <text y="130">3D Model Generated Successfully!</text>
+                                            <text y="150">Click download buttons to save</text>
+                                        </g>
+                                    </svg>
+                                </svg>
                             </div>
                         </div>
                         
@@ -1021,12 +1636,19 @@ HTML_TEMPLATE = """
         // Global state
         let currentImages = [null, null, null, null]; // Array for 4 images
         let processedImage = null;
+        let processedImageId = null;
         let generatedModels = null;
         let currentQRSession = null;
-        let qrCheckInterval = null;
+        let qrEvents = null;
+        let qrCheckInterval = null; // Poll timer when EventSource is unavailable
 
         // DOM elements
-        const imageUploadSlots = document.querySelectorAll('.image-upload-slot');
+        const imageUploadGrid = document.getElementById('image-upload-grid');
+        // Per-slot preview elements, looked up once; index with slotNumber - 1
+        const SLOTS = Array.from(imageUploadGrid.querySelectorAll('.image-upload-slot'), slot => ({
+            img: slot.querySelector('.preview-image'),
+            upload: slot.querySelector('.upload-content')
+        }));
         const processedPreview = document.getElementById('processed-preview');
         const processedImageEl = document.getElementById('processed-image');
         const removeBgCheckbox = document.getElementById('remove-bg');
@@ -1050,28 +1672,44 @@ HTML_TEMPLATE = """
         const qrCodeContainer = document.getElementById('qr-code-container');
         const qrCodeCanvas = document.getElementById('qr-code-canvas');
         const qrStatus = document.getElementById('qr-status');
-
-        // Event listeners for image upload slots
-        imageUploadSlots.forEach(slot => {
-            const uploadArea = slot.querySelector('.upload-area');
-            const imageInput = slot.querySelector('.image-input');
-            const previewImage = slot.querySelector('.preview-image');
-            const uploadContent = slot.querySelector('.upload-content');
-            const slotNumber = parseInt(slot.dataset.slot);
-
-            uploadArea.addEventListener('click', () => imageInput.click());
-            uploadArea.addEventListener('dragover', (e) => handleDragOver(e, uploadArea));
-            uploadArea.addEventListener('drop', (e) => handleDrop(e, uploadArea, slotNumber));
-            imageInput.addEventListener('change', (e) => handleImageSelect(e, slotNumber, previewImage, uploadContent));
+        const qrStatusStates = Object.fromEntries(
+            Array.from(qrStatus.children, el => [el.dataset.qrStatus, el])
+        );
+
+        // Event listeners for image upload slots, delegated from the grid;
+        // the slot number comes from the slot's data-slot attribute
+        imageUploadGrid.addEventListener('click', (e) => {
+            const uploadArea = e.target.closest('.upload-area');
+            if (!uploadArea) return;
+            uploadArea.closest('.image-upload-slot').querySelector('.image-input').click();
+        });
+        imageUploadGrid.addEventListener('dragover', (e) => {
+            const uploadArea = e.target.closest('.upload-area');
+            if (uploadArea) handleDragOver(e, uploadArea);
+        });
+        imageUploadGrid.addEventListener('drop', (e) => {
+            const uploadArea = e.target.closest('.upload-area');
+            if (!uploadArea) return;
+            handleDrop(e, uploadArea, parseInt(uploadArea.closest('.image-upload-slot').dataset.slot));
+        });
+        imageUploadGrid.addEventListener('change', (e) => {
+            if (!e.target.matches('.image-input')) return;
+            handleImageSelect(e, parseInt(e.target.dataset.slot));
         });
 
         // Other event listeners
-        foregroundRatioSlider.addEventListener('input', updateRatioValue);
-        mcResolutionSlider.addEventListener('input', updateResolutionValue);
+        foregroundRatioSlider.addEventListener('input', scheduleSliderUpdate);
+        mcResolutionSlider.addEventListener('input', scheduleSliderUpdate);
+        removeBgCheckbox.addEventListener('change', () => {
+            if (currentImages[0]) processImage(); // Reprocess with the new setting
+        });
         generateBtn.addEventListener('click', generateModel);
         downloadObjBtn.addEventListener('click', () => downloadModel('obj'));
         downloadGlbBtn.addEventListener('click', () => downloadModel('glb'));
         generateQRBtn.addEventListener('click', generateQRCode);
+        // Start fetching the QR library as soon as the user heads for the button
+        generateQRBtn.addEventListener('pointerenter', loadQRCodeLibrary, { once: true });
+        generateQRBtn.addEventListener('focus', loadQRCodeLibrary, { once: true });
 
         function handleDragOver(e, uploadArea) {
             e.preventDefault();
@@ -1087,41 +1725,37 @@ HTML_TEMPLATE = """
             }
         }
 
-        function handleImageSelect(e, slotNumber, previewImage, uploadContent) {
+        function handleImageSelect(e, slotNumber) {
             const file = e.target.files[0];
             if (file) {
-                handleFile(file, slotNumber, previewImage, uploadContent);
+                handleFile(file, slotNumber);
             }
         }
 
-        function handleFile(file, slotNumber, previewImage, uploadContent) {
+        function handleFile(file, slotNumber) {
             if (!file.type.startsWith('image/')) {
-                alert('Please select a valid image file');
+                showNotification('Please select a valid image file', 'error');
                 return;
             }
 
-            const reader = new FileReader();
-            reader.onload = (e) => {
-                currentImages[slotNumber - 1] = e.target.result; // Store in array (0-indexed)
-                
-                // Update preview for this slot
-                const slot = document.querySelector(`[data-slot="${slotNumber}"]`);
-                const previewImg = slot.querySelector('.preview-image');
-                const uploadContent = slot.querySelector('.upload-content');
-                
-                previewImg.src = e.target.result;
-                previewImg.classList.remove('hidden');
-                uploadContent.classList.add('hidden');
-                
-                // Only process the first image for 3D generation
-                if (slotNumber === 1) {
-                    processImage();
-                }
-                
-                // Update generate button state
-                updateGenerateButtonState();
-            };
-            reader.readAsDataURL(file);
+            // Blob URL points at the File itself; no base64 copy is made
+            setSlotImage(slotNumber, { file, url: URL.createObjectURL(file) });
+            updateImageSlot(slotNumber, currentImages[slotNumber - 1].url);
+            
+            // Only process the first image for 3D generation
+            if (slotNumber === 1) {
+                processImage();
+            }
+            
+            // Update generate button state
+            updateGenerateButtonState();
+        }
+
+        function setSlotImage(slotNumber, image) {
+            // Release the blob URL of the image being replaced
+            const old = currentImages[slotNumber - 1];
+            if (old && old.url.startsWith('blob:')) URL.revokeObjectURL(old.url);
+            currentImages[slotNumber - 1] = image; // Store in array (0-indexed)
         }
 
         function updateGenerateButtonState() {
@@ -1129,29 +1763,138 @@ HTML_TEMPLATE = """
             generateBtn.disabled = !currentImages[0];
         }
 
+        // Uploads never need more than the server's own decode size; larger photos
+        // are scaled and re-encoded to WebP in a worker before they are sent
+        const UPLOAD_MAX_SIDE = 1024;
+        const DOWNSCALE_WORKER_SOURCE = `
+            self.onmessage = async (e) => {
+                const { id, file, maxSide } = e.data;
+                try {
+                    const bitmap = await createImageBitmap(file);
+                    const scale = Math.min(1, maxSide / Math.max(bitmap.width, bitmap.height));
+                    if (scale === 1) {
+                        bitmap.close();
+                        self.postMessage({ id, blob: file });
+                        return;
+                    }
+                    const canvas = new OffscreenCanvas(
+                        Math.round(bitmap.width * scale), Math.round(bitmap.height * scale)
+                    );
+                    canvas.getContext('2d').drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+                    bitmap.close();
+                    const blob = await canvas.convertToBlob({ type: 'image/webp', quality: 0.9 });
+                    // Browsers without a WebP encoder hand back PNG; keep whichever is smaller
+                    self.postMessage({ id, blob: blob.size < file.size ? blob : file });
+                } catch (error) {
+                    self.postMessage({ id, blob: file });
+                }
+            };
+        `;
+        let downscaleWorker = null;
+        const downscaleJobs = new Map();
+        let downscaleJobId = 0;
+
+        function downscaleForUpload(file) {
+            if (typeof OffscreenCanvas === 'undefined' || typeof Worker === 'undefined') {
+                return Promise.resolve(file);
+            }
+            if (!downscaleWorker) {
+                const workerUrl = URL.createObjectURL(new Blob([DOWNSCALE_WORKER_SOURCE], { type: 'text/javascript' }));
+                downscaleWorker = new Worker(workerUrl);
+                URL.revokeObjectURL(workerUrl);
+                downscaleWorker.onmessage = (e) => {
+                    downscaleJobs.get(e.data.id)(e.data.blob);
+                    downscaleJobs.delete(e.data.id);
+                };
+            }
+            return new Promise((resolve) => {
+                const id = ++downscaleJobId;
+                downscaleJobs.set(id, resolve);
+                downscaleWorker.postMessage({ id, file, maxSide: UPLOAD_MAX_SIDE });
+            });
+        }
+
+        // In-flight requests, aborted when a newer one supersedes them
+        let processAbort = null;
+        let generateAbort = null;
+        let qrSessionAbort = null;
+
+        // Input hash and settings behind the current processedImage
+        let lastProcessKey = null;
+        let processSeq = 0;
+
+        async function hashBlob(blob) {
+            // crypto.subtle only exists in secure contexts (https, localhost)
+            if (!window.crypto || !crypto.subtle) return null;
+            const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', await blob.arrayBuffer()));
+            return Array.from(digest, byte => byte.toString(16).padStart(2, '0')).join('');
+        }
+
+        async function processKey(image) {
+            if (!image.file) return null;
+            if (!image.hash) image.hash = hashBlob(image.file); // Hashed once per image
+            const hash = await image.hash;
+            return hash && `${hash}|${removeBgCheckbox.checked}|${foregroundRatioSlider.value}`;
+        }
+
         async function processImage() {
             // Only process the first image
             if (!currentImages[0]) return;
+            
+            const seq = ++processSeq;
+            let key = null;
+            try {
+                key = await processKey(currentImages[0]);
+            } catch (error) {
+                console.error('Error hashing image:', error);
+            }
+            if (seq !== processSeq) return; // A newer call took over while hashing
+            
+            // Whatever is in flight was started for an older image or setting; it must
+            // not land after this call, even if this call turns out to be a no-op
+            if (processAbort) {
+                processAbort.abort();
+                processAbort = null;
+                hideProgress();
+            }
+            // Same bytes and settings as the current preview, e.g. the same file dropped again
+            if (key && key === lastProcessKey && processedImage) return;
+            
+            // A new image or setting makes any generation from the previous one stale
+            if (generateAbort) generateAbort.abort();
+            const controller = processAbort = new AbortController();
 
             try {
                 showProgress('Processing primary image...', 25);
+                const image = currentImages[0]; // Only use the first image
+                if (!image.file) {
+                    // Phone uploads arrive as server URLs; fetch the bytes once
+                    image.file = await (await fetch(image.url)).blob();
+                }
+                if (!image.upload) {
+                    // Done once per image; reprocessing with a new ratio reuses it
+                    image.upload = await downscaleForUpload(image.file);
+                }
+                if (controller.signal.aborted) return;
+                
+                // Send the file as multipart/form-data, no base64 encoding
+                const formData = new FormData();
+                formData.append('image', image.upload);
+                formData.append('removeBackground', removeBgCheckbox.checked);
+                formData.append('foregroundRatio', foregroundRatioSlider.value);
                 
                 const response = await fetch('/api/upload', {
                     method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({
-                        image: currentImages[0], // Only use the first image
-                        removeBackground: removeBgCheckbox.checked,
-                        foregroundRatio: parseFloat(foregroundRatioSlider.value)
-                    })
+                    body: formData,
+                    signal: controller.signal
                 });
 
                 const result = await response.json();
                 
                 if (result.success) {
                     processedImage = result.processedImage;
+                    processedImageId = result.image_id;
+                    lastProcessKey = key;
                     processedImageEl.src = processedImage;
                     processedPreview.classList.remove('hidden');
                     showProgress('Primary image processed successfully!', 100);
@@ -1160,46 +1903,44 @@ HTML_TEMPLATE = """
                     throw new Error(result.error);
                 }
             } catch (error) {
+                if (error.name === 'AbortError') return; // Superseded by a newer call
                 console.error('Error processing image:', error);
-                alert('Error processing primary image: ' + error.message);
+                showNotification('Error processing primary image: ' + error.message, 'error');
                 hideProgress();
+            } finally {
+                if (processAbort === controller) processAbort = null;
             }
         }
 
         async function generateModel() {
             if (!processedImage) return;
+            
+            if (generateAbort) generateAbort.abort();
+            const controller = generateAbort = new AbortController();
 
             try {
                 generateBtn.disabled = true;
                 showModelLoading();
                 showProgress('Generating 3D model...', 0);
 
-                // Simulate progress updates
-                const progressSteps = [
-                    { text: 'Analyzing image...', progress: 20 },
-                    { text: 'Creating triplane representation...', progress: 40 },
-                    { text: 'Generating mesh...', progress: 70 },
-                    { text: 'Optimizing geometry...', progress: 90 },
-                    { text: 'Finalizing model...', progress: 100 }
-                ];
-
-                for (let i = 0; i < progressSteps.length; i++) {
-                    await new Promise(resolve => setTimeout(resolve, 1000));
-                    showProgress(progressSteps[i].text, progressSteps[i].progress);
-                }
-
+                // Real progress comes from the task stream in waitForTask
                 const response = await fetch('/api/generate', {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
                     },
                     body: JSON.stringify({
-                        processedImage: processedImage,
+                        image_id: processedImageId,
                         mcResolution: parseInt(mcResolutionSlider.value)
-                    })
+                    }),
+                    signal: controller.signal
                 });
 
-                const result = await response.json();
+                const task = await response.json();
+                if (!task.success) {
+                    throw new Error(task.error);
+                }
+                const result = await waitForTask(task.task_id, controller.signal);
                 
                 if (result.success) {
                     generatedModels = result.models;
@@ -1211,87 +1952,81 @@ HTML_TEMPLATE = """
                     throw new Error(result.error);
                 }
             } catch (error) {
+                hideModelLoading();
+                if (error.name === 'AbortError') {
+                    // Superseded by a newer image; showModelLoading hid the placeholder
+                    modelPlaceholder.classList.remove('hidden');
+                    return;
+                }
                 console.error('Error generating model:', error);
-                alert('Error generating model: ' + error.message);
+                showNotification('Error generating model: ' + error.message, 'error');
                 hideProgress();
-                hideModelLoading();
             } finally {
+                if (generateAbort === controller) generateAbort = null;
                 generateBtn.disabled = false;
             }
         }
 
+        function waitForTask(taskId, signal) {
+            // Generation runs in the background; the server pushes each stage
+            if (typeof EventSource === 'undefined') return pollTask(taskId, signal);
+            
+            return new Promise((resolve, reject) => {
+                const events = new EventSource(`/api/task-events/${taskId}`);
+                signal.addEventListener('abort', () => {
+                    events.close();
+                    reject(signal.reason);
+                }, { once: true });
+                events.onmessage = (e) => {
+                    const stage = JSON.parse(e.data);
+                    showProgress(stage.text, stage.progress);
+                };
+                events.addEventListener('done', (e) => {
+                    events.close();
+                    resolve(JSON.parse(e.data));
+                });
+                events.onerror = () => {
+                    // Stream refused or dropped for good; fall back to polling
+                    if (events.readyState === EventSource.CLOSED && !signal.aborted) {
+                        resolve(pollTask(taskId, signal));
+                    }
+                };
+            });
+        }
+
+        async function pollTask(taskId, signal) {
+            while (true) {
+                const response = await fetch(`/api/task/${taskId}`, { signal });
+                const result = await response.json();
+                if (!result.success || result.status === 'completed') {
+                    return result;
+                }
+                if (result.text) showProgress(result.text, result.progress);
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                signal.throwIfAborted();
+            }
+        }
+
         function displayModel() {
             hideModelLoading();
             modelDisplay.classList.remove('hidden');
             
-            // Create a simple 3D preview placeholder
-            const canvas = document.getElementById('model-canvas');
-            const ctx = canvas.getContext('2d');
-            
-            // Set canvas size
-            canvas.width = canvas.offsetWidth;
-            canvas.height = canvas.offsetHeight;
-            
-            // Draw a simple 3D cube wireframe as placeholder
-            ctx.clearRect(0, 0, canvas.width, canvas.height);
-            ctx.strokeStyle = '#764ba2';
-            ctx.lineWidth = 2;
-            
-            const centerX = canvas.width / 2;
-            const centerY = canvas.height / 2;
-            const size = 100;
-            
-            // Draw wireframe cube
-            ctx.beginPath();
-            // Front face
-            ctx.rect(centerX - size/2, centerY - size/2, size, size);
-            // Back face (offset)
-            ctx.rect(centerX - size/2 + 20, centerY - size/2 - 20, size, size);
-            // Connect corners
-            ctx.moveTo(centerX - size/2, centerY - size/2);
-            ctx.lineTo(centerX - size/2 + 20, centerY - size/2 - 20);
-            ctx.moveTo(centerX + size/2, centerY - size/2);
-            ctx.lineTo(centerX + size/2 + 20, centerY - size/2 - 20);
-            ctx.moveTo(centerX - size/2, centerY + size/2);
-            ctx.lineTo(centerX - size/2 + 20, centerY + size/2 - 20);
-            ctx.moveTo(centerX + size/2, centerY + size/2);
-            ctx.lineTo(centerX + size/2 + 20, centerY + size/2 - 20);
-            ctx.stroke();
-            
-            // Add success text
-            ctx.fillStyle = '#ffffff';
-            ctx.font = '16px Inter';
-            ctx.textAlign = 'center';
-            ctx.fillText('3D Model Generated Successfully!', centerX, centerY + size + 30);
-            ctx.fillText('Click download buttons to save', centerX, centerY + size + 50);
+            // The placeholder cube is static SVG markup; nothing to redraw
         }
 
         function downloadModel(format) {
             if (!generatedModels || !generatedModels[format]) {
-                alert('Model not available for download');
+                showNotification('Model not available for download', 'error');
                 return;
             }
 
-            // Create download link
-            const modelData = generatedModels[format];
-            const byteCharacters = atob(modelData);
-            const byteNumbers = new Array(byteCharacters.length);
-            
-            for (let i = 0; i < byteCharacters.length; i++) {
-                byteNumbers[i] = byteCharacters.charCodeAt(i);
-            }
-            
-            const byteArray = new Uint8Array(byteNumbers);
-            const blob = new Blob([byteArray], { type: 'application/octet-stream' });
-            
-            const url = URL.createObjectURL(blob);
+            // Models are served as attachments; the browser downloads them directly
             const a = document.createElement('a');
-            a.href = url;
+            a.href = generatedModels[format];
             a.download = `triposr_model.${format}`;
             document.body.appendChild(a);
             a.click();
             document.body.removeChild(a);
-            URL.revokeObjectURL(url);
         }
 
         function showProgress(text, progress) {
@@ -1315,19 +2050,122 @@ HTML_TEMPLATE = """
         }
 
         function showSuccessMessage() {
-            // Create and show success notification
-            const notification = document.createElement('div');
-            notification.className = 'fixed top-4 right-4 bg-green-500 text-white px-6 py-3 rounded-lg shadow-lg z-50';
-            notification.textContent = '3D Model generated successfully!';
-            document.body.appendChild(notification);
+            showNotification('3D Model generated successfully!', 'success', 3000);
+        }
+
+        // QR rendering worker; once started it owns qr-code-canvas as an OffscreenCanvas
+        const QR_WORKER_SOURCE = `
+            let canvas = null;
+            self.onmessage = async (e) => {
+                if (e.data.canvas) {
+                    canvas = e.data.canvas;
+                    return;
+                }
+                const ctx = canvas.getContext('2d');
+                try {
+                    let bitmap = e.data.bitmap;
+                    if (!bitmap) {
+                        const response = await fetch(e.data.qrUrl);
+                        if (!response.ok) throw new Error('HTTP ' + response.status);
+                        bitmap = await createImageBitmap(await response.blob());
+                    }
+                    ctx.clearRect(0, 0, canvas.width, canvas.height);
+                    ctx.drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+                    bitmap.close();
+                } catch (error) {
+                    ctx.clearRect(0, 0, canvas.width, canvas.height);
+                    ctx.fillStyle = '#ffffff';
+                    ctx.fillRect(0, 0, canvas.width, canvas.height);
+                    ctx.fillStyle = '#000000';
+                    ctx.font = '12px Arial';
+                    ctx.textAlign = 'center';
+                    ctx.fillText('QR Code Generation Failed', canvas.width/2, canvas.height/2 - 10);
+                    ctx.fillText('Please refresh and try again', canvas.width/2, canvas.height/2 + 10);
+                }
+            };
+        `;
+        let qrWorker = null;
+
+        function getQRWorker() {
+            if (qrWorker) return qrWorker;
+            if (!('transferControlToOffscreen' in HTMLCanvasElement.prototype)) return null;
+            
+            const workerUrl = URL.createObjectURL(new Blob([QR_WORKER_SOURCE], { type: 'text/javascript' }));
+            qrWorker = new Worker(workerUrl);
+            URL.revokeObjectURL(workerUrl);
+            const offscreen = qrCodeCanvas.transferControlToOffscreen();
+            qrWorker.postMessage({ canvas: offscreen }, [offscreen]);
+            return qrWorker;
+        }
+
+        // QR library, only loaded once a QR code is wanted
+        const QRCODE_MODULE = 'https://cdn.jsdelivr.net/npm/qrcode@1.5.3/+esm';
+        const QRCODE_SCRIPT = 'https://unpkg.com/qrcode@1.5.3/build/qrcode.min.js';
+        let qrLibrary = null;
+
+        function loadScript(src) {
+            return new Promise((resolve, reject) => {
+                const script = document.createElement('script');
+                script.src = src;
+                script.onload = resolve;
+                script.onerror = () => reject(new Error(`Failed to load ${src}`));
+                document.head.appendChild(script);
+            });
+        }
+
+        function loadQRCodeLibrary() {
+            // ES module via dynamic import(); the UMD build from a second CDN as fallback.
+            // The promise is cached, so regenerating a code reuses the loaded library
+            if (!qrLibrary) {
+                qrLibrary = import(QRCODE_MODULE)
+                    .then(module => module.default)
+                    .catch((error) => {
+                        console.error('Failed to import QRCode module, trying alternative...', error);
+                        return loadScript(QRCODE_SCRIPT).then(() => window.QRCode);
+                    })
+                    .catch((error) => {
+                        console.error('Failed to load QRCode library from all sources', error);
+                        return undefined;
+                    });
+            }
+            return qrLibrary;
+        }
+
+        async function drawQRCode(text) {
+            const worker = getQRWorker();
+            const QRCode = await loadQRCodeLibrary();
+            if (!QRCode) {
+                generateQRCodeFallback(text, qrCodeCanvas);
+                return;
+            }
             
-            setTimeout(() => {
-                notification.remove();
-            }, 3000);
+            // The library draws on the main thread, so render into a scratch canvas
+            // when qr-code-canvas belongs to the worker
+            const target = worker ? document.createElement('canvas') : qrCodeCanvas;
+            await QRCode.toCanvas(target, text, {
+                width: 200,
+                margin: 2,
+                color: {
+                    dark: '#000000',
+                    light: '#FFFFFF'
+                }
+            });
+            if (worker) {
+                const bitmap = await createImageBitmap(target);
+                worker.postMessage({ bitmap }, [bitmap]);
+            }
         }
 
         // Fallback QR code generator using Google Charts API
         function generateQRCodeFallback(text, canvas) {
+            const qrUrl = `https://api.qrserver.com/v1/create-qr-code/?size=200x200&data=${encodeURIComponent(text)}`;
+            const worker = getQRWorker();
+            if (worker) {
+                // Fetch, decode and draw off the main thread
+                worker.postMessage({ qrUrl });
+                return;
+            }
+            
             const ctx = canvas.getContext('2d');
             const img = new Image();
             img.crossOrigin = 'anonymous';
@@ -1346,19 +2184,24 @@ HTML_TEMPLATE = """
                 ctx.fillText('QR Code Generation Failed', canvas.width/2, canvas.height/2 - 10);
                 ctx.fillText('Please refresh and try again', canvas.width/2, canvas.height/2 + 10);
             };
-            const qrUrl = `https://api.qrserver.com/v1/create-qr-code/?size=200x200&data=${encodeURIComponent(text)}`;
             img.src = qrUrl;
         }
 
         async function generateQRCode() {
+            if (qrSessionAbort) qrSessionAbort.abort();
+            const controller = qrSessionAbort = new AbortController();
+            
             try {
                 generateQRBtn.disabled = true;
                 generateQRBtn.textContent = 'Generating...';
+                // Fetch the QR library while the session is being created
+                loadQRCodeLibrary();
                 
                 // Create upload session
                 const response = await fetch('/api/qr-upload-session', {
                     method: 'POST',
-                    headers: { 'Content-Type': 'application/json' }
+                    headers: { 'Content-Type': 'application/json' },
+                    signal: controller.signal
                 });
                 
                 const result = await response.json();
@@ -1368,19 +2211,7 @@ HTML_TEMPLATE = """
                     
                     // Try to generate QR code with library, fallback to API if needed
                     try {
-                        if (typeof QRCode !== 'undefined') {
-                            await QRCode.toCanvas(qrCodeCanvas, result.upload_url, {
-                                width: 200,
-                                margin: 2,
-                                color: {
-                                    dark: '#000000',
-                                    light: '#FFFFFF'
-                                }
-                            });
-                        } else {
-                            // Use fallback method
-                            generateQRCodeFallback(result.upload_url, qrCodeCanvas);
-                        }
+                        await drawQRCode(result.upload_url);
                     } catch (qrError) {
                         console.log('Primary QR method failed, using fallback:', qrError);
                         generateQRCodeFallback(result.upload_url, qrCodeCanvas);
@@ -1396,49 +2227,133 @@ HTML_TEMPLATE = """
                     throw new Error(result.error);
                 }
             } catch (error) {
+                if (error.name === 'AbortError') return; // A newer session request took over
                 console.error('Error generating QR code:', error);
-                alert('Error generating QR code: ' + error.message);
+                showNotification('Error generating QR code: ' + error.message, 'error');
                 generateQRBtn.disabled = false;
                 generateQRBtn.textContent = 'Scan QR Code';
             }
         }
 
         function startQRStatusCheck() {
-            if (qrCheckInterval) clearInterval(qrCheckInterval);
+            stopQRStatusCheck();
             
-            qrCheckInterval = setInterval(async () => {
+            const session = currentQRSession;
+            if (typeof EventSource === 'undefined') {
+                pollQRStatus(session);
+                return;
+            }
+            
+            // The server pushes an event whenever the session changes
+            qrEvents = new EventSource(`/api/qr-events/${session}`);
+            qrEvents.onmessage = (e) => applyQRStatus(JSON.parse(e.data));
+            qrEvents.addEventListener('expired', () => {
+                updateQRStatus('expired');
+                stopQRStatusCheck();
+            });
+            // The server closes long-idle streams to free its thread; poll from then on
+            qrEvents.addEventListener('timeout', () => {
+                stopQRStatusCheck();
+                pollQRStatus(session);
+            });
+            qrEvents.onerror = () => {
+                // EventSource retries on its own; if it gave up, reconnect later
+                if (qrEvents && qrEvents.readyState === EventSource.CLOSED) {
+                    stopQRStatusCheck();
+                    setTimeout(() => {
+                        if (currentQRSession === session && !qrEvents) startQRStatusCheck();
+                    }, 30000);
+                }
+            };
+        }
+
+        function applyQRStatus(result) {
+            if (result.status === 'completed' && result.images.length > 0) {
+                // Images received via QR code
+                handleQRUploadComplete(result.images);
+            } else {
+                // Update status
+                updateQRStatus('waiting', result.image_count || 0);
+            }
+        }
+
+        function pollQRStatus(session) {
+            // For browsers without EventSource and after the stream times out. Backs off 1s, 1.5s, 2.25s, ...
+            // up to 8s while nothing arrives, and drops back to 1s on each new image
+            let delay = 1000;
+            let lastCount = 0;
+            let lastEtag = null;
+            const tick = async () => {
                 try {
-                    const response = await fetch(`/api/check-qr-session/${currentQRSession}`);
-                    const result = await response.json();
-                    
-                    if (result.success) {
-                        if (result.status === 'completed' && result.images.length > 0) {
-                            // Images received via QR code
-                            handleQRUploadComplete(result.images);
-                        } else {
-                            // Update status
-                            updateQRStatus('waiting', result.image_count || 0);
-                        }
-                    } else if (response.status === 410) {
+                    const response = await fetch(`/api/check-qr-session/${session}`, {
+                        headers: lastEtag ? { 'If-None-Match': lastEtag } : {}
+                    });
+                    if (response.status === 410) {
                         // Session expired
                         updateQRStatus('expired');
-                        clearInterval(qrCheckInterval);
+                        stopQRStatusCheck();
+                        return;
+                    }
+                    if (response.status === 304) {
+                        // Nothing changed since the last poll; no body to parse
+                        delay = Math.min(delay * 1.5, 8000);
+                    } else {
+                        lastEtag = response.headers.get('ETag');
+                        const result = await response.json();
+                        if (result.success) {
+                            applyQRStatus(result);
+                            if (result.image_count > lastCount) {
+                                lastCount = result.image_count;
+                                delay = 1000;
+                            } else {
+                                delay = Math.min(delay * 1.5, 8000);
+                            }
+                        }
                     }
                 } catch (error) {
                     console.error('Error checking QR status:', error);
+                    delay = Math.min(delay * 1.5, 8000);
                 }
-            }, 2000); // Check every 2 seconds
+                // Stopped, completed or replaced by a newer session while in flight
+                if (qrCheckInterval === null || currentQRSession !== session) return;
+                qrCheckInterval = setTimeout(tick, delay);
+            };
+            qrCheckInterval = setTimeout(tick, delay);
+        }
+
+        function stopQRStatusCheck() {
+            if (qrEvents) {
+                qrEvents.close();
+                qrEvents = null;
+            }
+            if (qrCheckInterval !== null) {
+                clearTimeout(qrCheckInterval);
+                qrCheckInterval = null;
+            }
+        }
+
+        async function fetchSessionImage(url) {
+            // One binary fetch per image; the same blob feeds the preview and the upload
+            try {
+                const response = await fetch(url);
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                const file = await response.blob();
+                return { file, url: URL.createObjectURL(file) };
+            } catch (error) {
+                console.error('Error fetching phone image:', error);
+                return { file: null, url }; // processImage fetches it again if needed
+            }
         }
 
-        function handleQRUploadComplete(images) {
-            clearInterval(qrCheckInterval);
+        async function handleQRUploadComplete(images) {
+            stopQRStatusCheck();
             
             // Populate image slots with uploaded images (first image goes to slot 1, others to remaining slots)
-            images.forEach((imageData, index) => {
-                if (index < 4) {
-                    currentImages[index] = imageData;
-                    updateImageSlot(index + 1, imageData);
-                }
+            const entries = await Promise.all(images.slice(0, 4).map(fetchSessionImage));
+            entries.forEach((entry, index) => setSlotImage(index + 1, entry));
+            // All slot previews change in the same frame: one style and layout pass
+            requestAnimationFrame(() => {
+                entries.forEach((entry, index) => updateImageSlot(index + 1, entry.url));
             });
             
             // Process the first image if available
@@ -1454,91 +2369,94 @@ HTML_TEMPLATE = """
         }
 
         function updateImageSlot(slotNumber, imageData) {
-            const slot = document.querySelector(`[data-slot="${slotNumber}"]`);
-            const previewImg = slot.querySelector('.preview-image');
-            const uploadContent = slot.querySelector('.upload-content');
-            
-            previewImg.src = imageData;
-            previewImg.classList.remove('hidden');
-            uploadContent.classList.add('hidden');
+            const slot = SLOTS[slotNumber - 1];
+            slot.img.src = imageData;
+            slot.img.classList.remove('hidden');
+            slot.upload.classList.add('hidden');
         }
 
         function updateQRStatus(status, imageCount = 0) {
-            const statusEl = document.getElementById('qr-status');
+            // Show the requested state and only touch the count text when it changed
+            for (const [name, el] of Object.entries(qrStatusStates)) {
+                el.classList.toggle('hidden', name !== status);
+            }
             
-            switch (status) {
-                case 'waiting':
-                    statusEl.innerHTML = `
-                        <div class="inline-flex items-center gap-2 text-blue-400">
-                            <div class="w-2 h-2 bg-blue-400 rounded-full animate-pulse"></div>
-                            <span class="text-sm">Waiting for upload... ${imageCount > 0 ? `(${imageCount} received)` : ''}</span>
-                        </div>
-                    `;
-                    break;
-                case 'completed':
-                    statusEl.innerHTML = `
-                        <div class="inline-flex items-center gap-2 text-green-400">
-                            <div class="w-2 h-2 bg-green-400 rounded-full"></div>
-                            <span class="text-sm">Upload completed! (${imageCount} images)</span>
-                        </div>
-                    `;
-                    break;
-                case 'expired':
-                    statusEl.innerHTML = `
-                        <div class="inline-flex items-center gap-2 text-red-400">
-                            <div class="w-2 h-2 bg-red-400 rounded-full"></div>
-                            <span class="text-sm">Session expired. Generate new QR code.</span>
-                        </div>
-                    `;
-                    break;
+            const count = qrStatusStates[status].querySelector('.qr-status-count');
+            if (!count) return;
+            let text = String(imageCount);
+            if (status === 'waiting') {
+                text = imageCount > 0 ? `(${imageCount} received)` : '';
             }
+            if (count.textContent !== text) count.textContent = text;
         }
 
-        function showNotification(message, type = 'info') {
-            const notification = document.createElement('div');
+        // One toast node, reused by every notification; toasts share a position,
+        // so a newer message simply replaces the one on screen
+        const notification = document.createElement('div');
+        notification.className = 'fixed top-4 right-4 text-white px-6 py-3 rounded-lg shadow-lg z-50 hidden';
+        document.body.appendChild(notification);
+        let notificationTimer = null;
+
+        // Non-blocking replacement for alert(); timers and streams keep running
+        function showNotification(message, type = 'info', duration = 5000) {
             const bgColor = type === 'success' ? 'bg-green-500' : type === 'error' ? 'bg-red-500' : 'bg-blue-500';
-            notification.className = `fixed top-4 right-4 ${bgColor} text-white px-6 py-3 rounded-lg shadow-lg z-50`;
+            notification.classList.remove('hidden', 'bg-green-500', 'bg-red-500', 'bg-blue-500');
+            notification.classList.add(bgColor);
             notification.textContent = message;
-            document.body.appendChild(notification);
             
-            setTimeout(() => {
-                notification.remove();
-            }, 5000);
+            clearTimeout(notificationTimer);
+            notificationTimer = setTimeout(() => {
+                notification.classList.add('hidden');
+            }, duration);
         }
 
-        // Clean up QR check interval when page unloads
-        window.addEventListener('beforeunload', () => {
-            if (qrCheckInterval) clearInterval(qrCheckInterval);
+        // Get rembg and the model through their first run while the user picks an image
+        window.addEventListener('load', () => {
+            fetch('/api/warmup', { method: 'POST', keepalive: true }).catch(() => {});
         });
 
+        // Close the QR event stream when page unloads
+        window.addEventListener('beforeunload', stopQRStatusCheck);
+
+        // Slider input fires many times per frame while dragging; apply it once per frame
+        let sliderFrame = 0;
+
+        function scheduleSliderUpdate() {
+            if (sliderFrame) return;
+            sliderFrame = requestAnimationFrame(() => {
+                sliderFrame = 0;
+                updateRatioValue();
+                updateResolutionValue();
+            });
+        }
+
+        // Reprocess once the ratio has settled; processImage aborts any older upload
+        const RATIO_DEBOUNCE_MS = 150;
+        let ratioTimer = null;
+
         function updateRatioValue() {
-            ratioValue.textContent = foregroundRatioSlider.value;
+            const ratio = foregroundRatioSlider.value;
+            if (ratioValue.textContent === ratio) return;
+            ratioValue.textContent = ratio;
             if (currentImages[0]) { // Only reprocess if first image exists
-                processImage(); // Reprocess with new ratio
+                clearTimeout(ratioTimer);
+                ratioTimer = setTimeout(processImage, RATIO_DEBOUNCE_MS); // Reprocess with new ratio
             }
         }
 
         function updateResolutionValue() {
-            resolutionValue.textContent = mcResolutionSlider.value;
+            const resolution = mcResolutionSlider.value;
+            if (resolutionValue.textContent !== resolution) resolutionValue.textContent = resolution;
         }
 
         // Add some visual effects - Enhanced Nexio style
         document.addEventListener('DOMContentLoaded', () => {
-            // Wait for QRCode library to load
-            function waitForQRCode() {
-                if (typeof QRCode !== 'undefined') {
-                    console.log('QRCode library loaded successfully');
-                } else {
-                    console.log('Waiting for QRCode library...');
-                    setTimeout(waitForQRCode, 100);
-                }
-            }
-            waitForQRCode();
-            
             // Animate elements on scroll with stagger effect
             const observer = new IntersectionObserver((entries) => {
                 entries.forEach((entry, index) => {
                     if (entry.isIntersecting) {
+                        // Each panel is revealed once; stop tracking it
+                        observer.unobserve(entry.target);
                         setTimeout(() => {
                             entry.target.style.opacity = '1';
                             entry.target.style.transform = 'translateY(0) scale(1)';
@@ -1564,84 +2482,36 @@ HTML_TEMPLATE = """
                 heroTitle.style.animation = 'float 6s ease-in-out infinite';
             }
             
-            // Enhanced generate button interactions
-            const generateBtn = document.getElementById('generate-btn');
-            if (generateBtn) {
-                generateBtn.addEventListener('mouseenter', () => {
-                    generateBtn.style.transform = 'translateY(-3px) scale(1.05)';
-                    generateBtn.style.boxShadow = '0 12px 35px rgba(102, 126, 234, 0.7)';
-                });
-                generateBtn.addEventListener('mouseleave', () => {
-                    generateBtn.style.transform = 'translateY(0) scale(1)';
-                    generateBtn.style.boxShadow = '0 4px 15px rgba(102, 126, 234, 0.4)';
-                });
-            }
-            
-            // Add parallax effect to background
-            let mouseX = 0, mouseY = 0;
-            document.addEventListener('mousemove', (e) => {
-                mouseX = (e.clientX / window.innerWidth - 0.5) * 2;
-                mouseY = (e.clientY / window.innerHeight - 0.5) * 2;
-                
-                const bg = document.querySelector('.nexio-bg');
-                if (bg) {
-                    bg.style.transform = `translate(${mouseX * 5}px, ${mouseY * 5}px)`;
-                }
+            // Add parallax effect to background; at most one transform write per frame,
+            // with the viewport size only read again on resize
+            const bg = document.querySelector('.nexio-bg');
+            let mouseX = 0, mouseY = 0, parallaxFrame = 0;
+            let viewportWidth = window.innerWidth, viewportHeight = window.innerHeight;
+            window.addEventListener('resize', () => {
+                viewportWidth = window.innerWidth;
+                viewportHeight = window.innerHeight;
             });
-            
-            // Add glow effect to interactive elements
-            document.querySelectorAll('.enhanced-glass').forEach(el => {
-                el.addEventListener('mouseenter', () => {
-                    el.style.boxShadow = `
-                        0 20px 60px rgba(0, 0, 0, 0.6),
-                        0 0 60px rgba(147, 51, 234, 0.4),
-                        inset 0 1px 0 rgba(255, 255, 255, 0.2)
-                    `;
-                });
-                el.addEventListener('mouseleave', () => {
-                    el.style.boxShadow = `
-                        0 8px 32px rgba(0, 0, 0, 0.4),
-                        inset 0 1px 0 rgba(255, 255, 255, 0.15),
-                        0 0 0 1px rgba(255, 255, 255, 0.05)
-                    `;
+            // Passive: the handler never cancels, so scrolling need not wait on it
+            document.addEventListener('pointermove', (e) => {
+                mouseX = (e.clientX / viewportWidth - 0.5) * 2;
+                mouseY = (e.clientY / viewportHeight - 0.5) * 2;
+                if (!bg || parallaxFrame) return;
+                parallaxFrame = requestAnimationFrame(() => {
+                    parallaxFrame = 0;
+                    bg.style.transform = `translate(${mouseX * 5}px, ${mouseY * 5}px)`;
                 });
-            });
+            }, { passive: true });
+
         });
-        
-        // Add enhanced animation keyframes
-        const enhancedStyle = document.createElement('style');
-        enhancedStyle.textContent = `
-            @keyframes float {
-                0%, 100% { transform: translateY(0px) rotate(0deg); }
-                33% { transform: translateY(-8px) rotate(1deg); }
-                66% { transform: translateY(4px) rotate(-1deg); }
-            }
-            
-            @keyframes glow {
-                0%, 100% { box-shadow: 0 0 20px rgba(102, 126, 234, 0.3); }
-                50% { box-shadow: 0 0 60px rgba(147, 51, 234, 0.6); }
-            }
-            
-            @keyframes pulse {
-                0%, 100% { transform: scale(1); opacity: 1; }
-                50% { transform: scale(1.05); opacity: 0.8; }
-            }
-            
-            .animate-in {
-                animation: glow 2s ease-in-out infinite alternate;
-            }
-            
-            /* Enhanced transitions for all interactive elements */
-            * {
-                transition: transform 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            }
-        `;
-        document.head.appendChild(enhancedStyle);
     </script>
 </body>
 </html>
 """
 
+# Built once at import: the index page is static, the mobile page is compiled once
+INDEX_HTML_GZ = gzip.compress(HTML_TEMPLATE.encode('utf-8'), compresslevel=9)
+MOBILE_UPLOAD_PAGE = app.jinja_env.from_string(MOBILE_UPLOAD_TEMPLATE)
+
 if __name__ == '__main__':
     import argparse
     
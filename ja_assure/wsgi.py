@@ -0,0 +1,14 @@
+"""
+WSGI entry point for production servers
+
+    gunicorn --bind 0.0.0.0:5000 --worker-class gthread --workers 1 --threads 32 --timeout 600 wsgi:app
+
+Keep a single worker: the model, rembg session and upload sessions live in
+module globals, and threads within the worker share them. Every open
+/api/qr-events or /api/task-events stream holds one of those threads, so size
+--threads for them too (see "Quick start" in the README).
+"""
+
+from web_app import app
+
+__all__ = ['app']